@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indexed store for child gold annotations (SQLite):
+- Built from gold_encodings_child.json and the upsert sidecar, re-synced only
+  when one of them changes (mtime, size)
+- Per-language prefix queries ("fr_" ...) as range scans on the id primary key
+- Incremental upserts of new annotations without rewriting the JSON
+- Streamed metrics: prompt ids are checked in chunks, the gold is never loaded whole
+
+The store is a derived cache: it lives in $DHATU_CACHE_DIR (default
+~/.cache/paninifs_dhatu), never in the source tree, and can be deleted.
+
+Upserts are appended to gold_encodings_child_upserts.jsonl next to the JSON
+({"id", "encoding"} per line, the last line for an id wins); that tracked
+sidecar is their source of truth and is re-imported on sync. Rows are tagged
+with their source ('json' or 'upsert'); lookups see an upserted row in place
+of the JSON one; metrics only count JSON rows unless include_upserts.
+"""
+from __future__ import annotations
+import argparse, itertools, json, os, sqlite3, sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLD_JSON = os.path.join(HERE, "gold_encodings_child.json")
+UPSERTS_JSONL = os.path.join(HERE, "gold_encodings_child_upserts.jsonl")
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "paninifs_dhatu")
+SCHEMA_VERSION = 2
+CHUNK = 500  # ids per IN (...) query, below SQLite's variable limit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS annotations (
+    id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    lang TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    encoding TEXT NOT NULL,
+    PRIMARY KEY (id, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS annotations_lang ON annotations (lang);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# Several rows may share an id (one per source): the upserted one wins
+_PREFERENCE = "source = 'upsert'"
+
+def default_db_path() -> str:
+    """Store location in the cache directory ($DHATU_CACHE_DIR or ~/.cache/paninifs_dhatu)."""
+    return os.path.join(os.environ.get("DHATU_CACHE_DIR", DEFAULT_CACHE_DIR), "gold_encodings_child.sqlite")
+
+def lang_of(utterance_id: str) -> str:
+    """Language code of an utterance id (prefix before the first underscore)."""
+    return utterance_id.split("_", 1)[0]
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def file_stamp(path: Optional[str]) -> str:
+    """Change stamp of a source file (path, mtime, size); empty if absent."""
+    if path is None or not os.path.exists(path):
+        return ""
+    st = os.stat(path)
+    return f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+
+def read_upserts(path: str) -> Iterator[Tuple[str, List[str]]]:
+    """(id, primitives) from the upsert sidecar, in file order; nothing if it does not exist."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield row["id"], row["encoding"]
+
+def read_gold_json(path: str) -> Dict[str, List[str]]:
+    # Handle empty or invalid JSON gracefully by treating as empty mapping
+    try:
+        if os.path.getsize(path) == 0:
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            gold = json.load(f)
+        return gold if gold is not None else {}
+    except json.JSONDecodeError:
+        print(f"[warn] {os.path.basename(path)} is empty or invalid JSON; proceeding with empty annotations", file=sys.stderr)
+        return {}
+
+class GoldStore:
+    """SQLite index of gold encodings: id -> primitives (with their count)."""
+
+    def __init__(self, db_path: Optional[str] = None, json_path: Optional[str] = GOLD_JSON,
+                 upserts_path: Optional[str] = UPSERTS_JSONL):
+        if db_path is None:
+            db_path = default_db_path()
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.json_path = json_path
+        self.upserts_path = upserts_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(_SCHEMA)
+        if self._meta("schema") not in (None, str(SCHEMA_VERSION)):
+            raise ValueError(f"Unsupported gold store schema in {db_path}: {self._meta('schema')}")
+        self._set_meta("schema", str(SCHEMA_VERSION))
+        self.conn.commit()
+        if json_path is not None:
+            self.sync()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def sync(self, force: bool = False) -> bool:
+        """Re-import the gold JSON and the upsert sidecar if either changed; True if imported."""
+        if not os.path.exists(self.json_path):
+            raise FileNotFoundError(self.json_path)
+        json_stamp, upserts_stamp = file_stamp(self.json_path), file_stamp(self.upserts_path)
+        if not force and self._meta("json_stamp") == json_stamp and self._meta("upserts_stamp") == upserts_stamp:
+            return False
+        gold = read_gold_json(self.json_path)
+        with self.conn:
+            self.conn.execute("DELETE FROM annotations")
+            self._write(gold.items(), "json")
+            if self.upserts_path is not None:
+                self._write(read_upserts(self.upserts_path), "upsert")
+            self._set_meta("json_stamp", json_stamp)
+            self._set_meta("upserts_stamp", upserts_stamp)
+        return True
+
+    def _write(self, items: Iterable[Tuple[str, Sequence[str]]], source: str) -> int:
+        rows = ((uid, source, lang_of(uid), len(enc), json.dumps(list(enc), ensure_ascii=False))
+                for uid, enc in items)
+        cursor = self.conn.executemany(
+            "INSERT OR REPLACE INTO annotations (id, source, lang, length, encoding) VALUES (?, ?, ?, ?, ?)", rows)
+        return cursor.rowcount
+
+    def upsert(self, items: Iterable[Tuple[str, Sequence[str]]]) -> int:
+        """Insert or replace annotations (id, primitives); returns the number of rows written.
+
+        Each annotation is also appended to the upsert sidecar (if any), so it
+        survives a deleted cache.
+        """
+        if self.upserts_path is None:
+            with self.conn:
+                return self._write(items, "upsert")
+        # The store stays in sync only if it had already imported the sidecar as it was
+        in_sync = self._meta("upserts_stamp") == file_stamp(self.upserts_path)
+        def logged():
+            with open(self.upserts_path, "a", encoding="utf-8") as f:
+                for uid, enc in items:
+                    f.write(json.dumps({"id": uid, "encoding": list(enc)}, ensure_ascii=False) + "\n")
+                    yield uid, enc
+        with self.conn:
+            written = self._write(logged(), "upsert")
+            if in_sync:
+                self._set_meta("upserts_stamp", file_stamp(self.upserts_path))
+        return written
+
+    def get(self, utterance_id: str) -> Optional[List[str]]:
+        row = self.conn.execute(f"SELECT encoding FROM annotations WHERE id = ? ORDER BY {_PREFERENCE} DESC LIMIT 1",
+                                (utterance_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __contains__(self, utterance_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM annotations WHERE id = ?", (utterance_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(DISTINCT id) FROM annotations").fetchone()[0]
+
+    def iter_prefix(self, prefix: str) -> Iterator[Tuple[str, List[str]]]:
+        """(id, primitives) for ids starting with prefix, in id order (index range scan)."""
+        order = f"ORDER BY id, {_PREFERENCE} DESC"
+        if not prefix:
+            cursor = self.conn.execute(f"SELECT id, encoding FROM annotations {order}")
+        else:
+            cursor = self.conn.execute(
+                f"SELECT id, encoding FROM annotations WHERE id >= ? AND id < ? {order}",
+                (prefix, prefix_upper_bound(prefix)))
+        previous = None
+        for uid, enc in cursor:
+            if uid != previous:
+                previous = uid
+                yield uid, json.loads(enc)
+
+    def iter_lang(self, lang_code: str) -> Iterator[Tuple[str, List[str]]]:
+        return self.iter_prefix(f"{lang_code}_")
+
+    def lengths(self, ids: Iterable[str], include_upserts: bool = True) -> Iterator[Tuple[str, int]]:
+        """(id, primitive count) for the annotated ids among ids, queried in chunks.
+
+        Follows the input order and multiplicity: a repeated id is yielded each time.
+        include_upserts=False only looks at the rows imported from the JSON.
+        """
+        where = "" if include_upserts else " AND source = 'json'"
+        it = iter(ids)
+        while True:
+            chunk = list(itertools.islice(it, CHUNK))
+            if not chunk:
+                return
+            distinct = list(dict.fromkeys(chunk))
+            marks = ",".join("?" * len(distinct))
+            # Ascending preference: an upserted row overwrites the JSON one
+            found = dict(self.conn.execute(
+                f"SELECT id, length FROM annotations WHERE id IN ({marks}){where} ORDER BY {_PREFERENCE}", distinct))
+            for uid in chunk:
+                if uid in found:
+                    yield uid, found[uid]
+
+    def metrics(self, ids: Iterable[str], include_upserts: bool = False) -> Dict[str, float]:
+        """Coverage/avg length over a stream of utterance ids (same fields as compute_child_metrics).
+
+        Only the gold JSON counts by default; include_upserts adds the upserted annotations.
+        """
+        total = 0
+        def counted():
+            nonlocal total
+            for uid in ids:
+                total += 1
+                yield uid
+        covered = length_sum = 0
+        for _uid, length in self.lengths(counted(), include_upserts):
+            covered += 1
+            length_sum += length
+        return {
+            "sentences": total,
+            "covered": covered,
+            "coverage_rate": round(covered/total, 3) if total else 0.0,
+            "avg_primitives_per_encoding": round(length_sum/covered, 3) if covered else 0.0
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Annotation count per language."""
+        return dict(self.conn.execute("SELECT lang, COUNT(DISTINCT id) FROM annotations GROUP BY lang ORDER BY lang"))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _read_upsert_file(path: str) -> Iterator[Tuple[str, List[str]]]:
+    if path.endswith(".jsonl"):
+        yield from read_upserts(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).items()
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Indexed store for child gold annotations")
+    p.add_argument("--db", help="SQLite store (default: gold_encodings_child.sqlite in $DHATU_CACHE_DIR or ~/.cache/paninifs_dhatu)")
+    p.add_argument("--json", default=GOLD_JSON, help="Gold JSON source (re-imported when it changes)")
+    p.add_argument("--upserts", default=UPSERTS_JSONL, help="Upsert sidecar (JSONL), appended to by --upsert")
+    p.add_argument("--rebuild", action="store_true", help="Force a re-import of the gold JSON and the upsert sidecar")
+    p.add_argument("--upsert", metavar="FILE", help="Upsert annotations from a JSON object or JSONL of {id: [...]} / {\"id\", \"encoding\"}")
+    p.add_argument("--prefix", metavar="PREFIX", help="Print annotations whose id starts with PREFIX (e.g. fr_)")
+    p.add_argument("--stats", action="store_true", help="Annotation counts per language")
+    args = p.parse_args(argv)
+
+    with GoldStore(args.db, args.json, args.upserts) as store:
+        if args.rebuild:
+            store.sync(force=True)
+        if args.upsert:
+            n = store.upsert(_read_upsert_file(args.upsert))
+            print(f"Upserted {n} annotation(s)")
+        if args.prefix is not None:
+            for uid, enc in store.iter_prefix(args.prefix):
+                print(f"{uid}: {' '.join(enc)}")
+        if args.stats:
+            print(json.dumps(store.stats(), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,26 @@ Generate research helper artifacts from Dhātu child prompts:
 - docs/data/dhatu_child_phenomena_summary.md: table per language
 - docs/data/dhatu_child_langs.md: languages with counts and external child sources
 
-Run from repo root or from this folder.
+Each source is loaded once into an indexed in-memory model. A small manifest
+(docs/data/.dhatu_report_manifest.json) records source and output sha256 only,
+so it is identical on every machine and can be committed with the outputs:
+when no hash changed and the outputs are intact, nothing is rebuilt; otherwise
+only outputs whose content changed are rewritten. Hashes are reused while a
+file's mtime/size are unchanged, through a machine-local stamp cache in
+$DHATU_CACHE_DIR (default ~/.cache/paninifs_dhatu), never in the tree.
+
+Run from repo root or from this folder (--force rebuilds unconditionally).
 """
 from __future__ import annotations
-import os, json, sys
+import argparse, hashlib, os, json, sys
 from collections import Counter
 
 HERE = os.path.dirname(os.path.abspath(__file__))
 REPO = os.path.abspath(os.path.join(HERE, "..", ".."))
 DOCS_DATA = os.path.join(REPO, "docs", "data")
+MANIFEST = os.path.join(DOCS_DATA, ".dhatu_report_manifest.json")
+MANIFEST_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "paninifs_dhatu")
 
 def load_child_prompts(lang_code: str):
     path = os.path.join(HERE, "prompts_child", f"{lang_code}.json")
@@ -37,22 +48,43 @@ def load_typological_sample():
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def find_lang_in_sample(sample, code):
-    # try iso639_3 exact, then case-insensitive name match
-    for lang in sample.get("languages", []):
-        if lang.get("iso639_3") == code:
-            return lang
-    for lang in sample.get("languages", []):
-        if str(lang.get("name", "")).lower() == code.lower():
-            return lang
-    return None
+class ReportModel:
+    """All report sources, loaded once: prompts and phenomena per language, indexed sample."""
+
+    def __init__(self, langs, prompts, sample):
+        self.langs = langs
+        self.prompts = prompts  # lang code -> prompts data (None if missing)
+        self.phenomena = {lc: Counter(ph for it in data.get("items", []) for ph in it.get("phenomena", []))
+                          for lc, data in prompts.items() if data}
+        self.sample = sample
+        # iso639_3 exact, then case-insensitive name; first entry wins, as a linear scan would
+        self._by_iso = {}
+        self._by_name = {}
+        for lang in sample.get("languages", []):
+            self._by_iso.setdefault(lang.get("iso639_3"), lang)
+            self._by_name.setdefault(str(lang.get("name", "")).lower(), lang)
+
+    @classmethod
+    def load(cls, langs=None):
+        langs = list_available_child_langs() if langs is None else langs
+        return cls(langs, {lc: load_child_prompts(lc) for lc in langs}, load_typological_sample())
+
+    def find_lang(self, code):
+        return self._by_iso.get(code) or self._by_name.get(code.lower())
 
 def ensure_docs_dir():
     os.makedirs(DOCS_DATA, exist_ok=True)
 
-def write_markdown(path: str, content: str):
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+def write_markdown(path: str, content: str) -> bool:
+    """Write content unless the file already holds exactly it; True if written."""
+    data = content.encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
 
 def make_phenomena_summary_row(lc: str, items, cnt: Counter):
     distinct = len(cnt)
@@ -60,34 +92,30 @@ def make_phenomena_summary_row(lc: str, items, cnt: Counter):
     src = f"experiments/dhatu/prompts_child/{lc}.json"
     return f"| `{lc}` | {items} | {distinct} | {top5} | `{src}` |\n"
 
-def generate_phenomena_summary_md(langs):
+def generate_phenomena_summary_md(model: ReportModel):
     lines = []
     lines.append("<!-- Generated by experiments/dhatu/report.py -->\n")
     lines.append("### Synthèse phénomènes par langue (child prompts)\n\n")
     lines.append("| Lang | Items | Phénomènes distincts | Top 5 | Source |\n")
     lines.append("|:----:|------:|----------------------:|:------|:-------|\n")
-    for lc in langs:
-        data = load_child_prompts(lc)
+    for lc in model.langs:
+        data = model.prompts.get(lc)
         if not data:
             continue
-        cnt = Counter()
-        for it in data.get("items", []):
-            for ph in it.get("phenomena", []):
-                cnt[ph] += 1
-        lines.append(make_phenomena_summary_row(lc, len(data.get("items", [])), cnt))
+        lines.append(make_phenomena_summary_row(lc, len(data.get("items", [])), model.phenomena[lc]))
     return "".join(lines)
 
-def generate_child_langs_md(langs, sample):
+def generate_child_langs_md(model: ReportModel):
     lines = []
     lines.append("<!-- Generated by experiments/dhatu/report.py -->\n")
     lines.append("### Langues, volumes et sources enfant\n\n")
     lines.append("| Lang | Nom | Items | Sources enfant (externe) |\n")
     lines.append("|:----:|:-----|------:|:-------------------------|\n")
-    for lc in langs:
-        data = load_child_prompts(lc) or {}
+    for lc in model.langs:
+        data = model.prompts.get(lc) or {}
         name = data.get("name") or data.get("lang", lc)
         n = len(data.get("items", []))
-        lang_meta = find_lang_in_sample(sample, lc)
+        lang_meta = model.find_lang(lc)
         sources_md = ""
         if lang_meta and lang_meta.get("child_sources"):
             parts = []
@@ -98,16 +126,93 @@ def generate_child_langs_md(langs, sample):
         lines.append(f"| `{lc}` | {name} | {n} | {sources_md} |\n")
     return "".join(lines)
 
-def main():
+OUTPUTS = {
+    "dhatu_child_phenomena_summary.md": generate_phenomena_summary_md,
+    "dhatu_child_langs.md": generate_child_langs_md,
+}
+
+def source_paths(langs):
+    """Files the outputs depend on (including this script), relative to the repo."""
+    paths = [os.path.join(HERE, "prompts_child", f"{lc}.json") for lc in langs]
+    paths += [os.path.join(HERE, "typological_sample.json"), os.path.abspath(__file__)]
+    return [os.path.relpath(p, REPO) for p in paths]
+
+def stamp_cache_path():
+    return os.path.join(os.environ.get("DHATU_CACHE_DIR", DEFAULT_CACHE_DIR), "report_stamps.json")
+
+def read_json_file(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def file_hashes(rel_paths, stamps):
+    """{path: sha256 or None if missing}; the hash is reused while mtime and size are unchanged.
+
+    stamps: local cache {absolute path: {mtime_ns, size, sha256}}, updated in place.
+    """
+    hashes = {}
+    for rel in rel_paths:
+        path = os.path.join(REPO, rel)
+        if not os.path.exists(path):
+            hashes[rel] = None
+            continue
+        st = os.stat(path)
+        old = stamps.get(path)
+        if not (old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size):
+            with open(path, "rb") as f:
+                old = stamps[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                                      "sha256": hashlib.sha256(f.read()).hexdigest()}
+        hashes[rel] = old["sha256"]
+    return hashes
+
+def read_manifest():
+    manifest = read_json_file(MANIFEST)
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+def write_manifest(sources, outputs):
+    write_markdown(MANIFEST, json.dumps({"version": MANIFEST_VERSION, "sources": sources, "outputs": outputs},
+                                        ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+
+def write_stamp_cache(stamps, previous):
+    if stamps == previous:
+        return
+    path = stamp_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(stamps, f, ensure_ascii=False, sort_keys=True)
+    except OSError:
+        pass  # only a shortcut: hashes are recomputed next time
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Generate docs/data Markdown from Dhātu child prompts")
+    p.add_argument("--force", action="store_true", help="Rebuild even if sources and outputs are unchanged")
+    args = p.parse_args(argv)
+
     ensure_docs_dir()
     langs = list_available_child_langs()
-    sample = load_typological_sample()
-    ph_md = generate_phenomena_summary_md(langs)
-    write_markdown(os.path.join(DOCS_DATA, "dhatu_child_phenomena_summary.md"), ph_md)
-    langs_md = generate_child_langs_md(langs, sample)
-    write_markdown(os.path.join(DOCS_DATA, "dhatu_child_langs.md"), langs_md)
-    print("Generated: docs/data/dhatu_child_phenomena_summary.md")
-    print("Generated: docs/data/dhatu_child_langs.md")
+    manifest = read_manifest()
+    previous_stamps = read_json_file(stamp_cache_path())
+    stamps = dict(previous_stamps)
+    sources = file_hashes(source_paths(langs), stamps)
+    output_paths = [os.path.relpath(os.path.join(DOCS_DATA, name), REPO) for name in OUTPUTS]
+    outputs = file_hashes(output_paths, stamps)
+
+    if (not args.force and manifest and sources == manifest.get("sources")
+            and all(outputs.values()) and outputs == manifest.get("outputs")):
+        write_stamp_cache(stamps, previous_stamps)
+        print(f"Up to date: {len(langs)} languages, nothing to regenerate")
+        return
+
+    model = ReportModel.load(langs)
+    for name, generate in OUTPUTS.items():
+        rel = os.path.relpath(os.path.join(DOCS_DATA, name), REPO)
+        written = write_markdown(os.path.join(DOCS_DATA, name), generate(model))
+        print(f"{'Generated' if written else 'Unchanged'}: {rel}")
+    write_manifest(sources, file_hashes(output_paths, stamps))
+    write_stamp_cache(stamps, previous_stamps)
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -5,16 +5,50 @@ Minimal Dhātu experiment harness:
 - Loads inventory, toy corpus, and gold encodings
 - Reports simple metrics: coverage and average length
 - Typological sample support (child-directed-first): list languages and sources
+
+Each subcommand loads only the artifacts it needs; parsed files are memoized
+per process, keyed by (mtime, size), so repeated calls (or a long-lived
+importer) never re-parse an unchanged file. The memoized objects are shared
+by every caller: treat them as read-only (copy.deepcopy before editing).
+--timing reports startup time.
 """
 from __future__ import annotations
+import time
+_T0 = time.perf_counter()
 import argparse, json, os, sys
 
 HERE = os.path.dirname(os.path.abspath(__file__))
+PROMPTS_CHILD = os.path.join(HERE, "prompts_child")
 
-def load_json(name: str):
-    with open(os.path.join(HERE, name), 'r', encoding='utf-8') as f:
+# path -> ((mtime_ns, size), parsed data); file name -> cumulated parse seconds
+_JSON_CACHE: dict = {}
+_LOAD_TIMES: dict = {}
+
+def _load_cached(path: str, parse):
+    """parse(path), memoized until the file changes; the same object is returned to every caller."""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _JSON_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    t = time.perf_counter()
+    data = parse(path)
+    name = os.path.relpath(path, HERE)
+    _LOAD_TIMES[name] = _LOAD_TIMES.get(name, 0.0) + time.perf_counter() - t
+    _JSON_CACHE[path] = (stamp, data)
+    return data
+
+def _parse_json(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def load_json(name: str):
+    """Parsed artifact (relative to this folder), memoized until the file changes.
+
+    The result is shared process-wide and must not be mutated.
+    """
+    return _load_cached(os.path.join(HERE, name), _parse_json)
+
 def list_sentences(corpus):
     for s in corpus["sentences"]:
         print(f"{s['id']:<10} [{s['lang']}] {s['text']}")
@@ -33,38 +67,23 @@ def compute_metrics(corpus, gold):
         "avg_primitives_per_encoding": round(avg_len, 3)
     }
 
-def compute_child_metrics(lang_codes):
-    """Compute coverage/avg length for child prompts using gold_encodings_child.json."""
+def compute_child_metrics(lang_codes, include_upserts=False):
+    """Compute coverage/avg length for child prompts using gold_encodings_child.json.
+
+    Annotations are read from the indexed store (gold_store.py, cached under
+    $DHATU_CACHE_DIR), re-synced only when its sources change; prompt ids are
+    streamed against it in chunks. include_upserts also counts the annotations
+    of the upsert sidecar (gold_encodings_child_upserts.jsonl).
+    """
     gold_path = os.path.join(HERE, "gold_encodings_child.json")
     if not os.path.exists(gold_path):
         raise FileNotFoundError(gold_path)
-    # Handle empty or invalid JSON gracefully by treating as empty mapping
-    gold: dict
-    try:
-        if os.path.getsize(gold_path) == 0:
-            gold = {}
-        else:
-            with open(gold_path, "r", encoding="utf-8") as f:
-                gold = json.load(f)
-            if gold is None:
-                gold = {}
-    except json.JSONDecodeError:
-        # Print a lightweight notice to stderr and continue with empty annotations
-        print(f"[warn] gold_encodings_child.json is empty or invalid JSON; proceeding with empty annotations", file=sys.stderr)
-        gold = {}
-    from collections import defaultdict
+    from gold_store import GoldStore  # imported lazily: other subcommands don't need sqlite
     out = {}
-    for lc in lang_codes:
-        data = load_child_prompts(lc)
-        ids = [it["id"] for it in data.get("items", [])]
-        covered = [gid for gid in ids if gid in gold]
-        lengths = [len(gold[gid]) for gid in covered]
-        out[lc] = {
-            "sentences": len(ids),
-            "covered": len(covered),
-            "coverage_rate": round(len(covered)/len(ids), 3) if ids else 0.0,
-            "avg_primitives_per_encoding": round(sum(lengths)/len(lengths), 3) if lengths else 0.0
-        }
+    with GoldStore(json_path=gold_path) as store:
+        for lc in lang_codes:
+            data = load_child_prompts(lc)
+            out[lc] = store.metrics((it["id"] for it in data.get("items", [])), include_upserts)
     return out
 
 def list_typological_sample(sample):
@@ -79,11 +98,10 @@ def list_typological_sample(sample):
             print(f"    • {src['type']}: {src['name']} -> {src['url']}")
 
 def load_child_prompts(lang_code: str):
-    path = os.path.join(HERE, "prompts_child", f"{lang_code}.json")
+    path = os.path.join(PROMPTS_CHILD, f"{lang_code}.json")
     if not os.path.exists(path):
         raise FileNotFoundError(path)
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _load_cached(path, _parse_json)
 
 def list_child_prompts(lang_code: str):
     data = load_child_prompts(lang_code)
@@ -102,14 +120,25 @@ def aggregate_phenomena(lang_codes):
                 cnt[ph] += 1
     return cnt
 
-def list_available_child_langs():
-    base = os.path.join(HERE, "prompts_child")
+def child_langs():
+    """Child prompt language codes, from file names only (nothing is parsed)."""
     langs = []
-    if os.path.isdir(base):
-        for fn in os.listdir(base):
+    if os.path.isdir(PROMPTS_CHILD):
+        for fn in os.listdir(PROMPTS_CHILD):
             if fn.endswith(".json") and fn not in ("schema.json",):
                 langs.append(os.path.splitext(fn)[0])
-    print("Available child prompt languages:", ", ".join(sorted(langs)))
+    return langs
+
+def list_available_child_langs():
+    print("Available child prompt languages:", ", ".join(sorted(child_langs())))
+
+def report_timing(startup: float):
+    total = time.perf_counter() - _T0
+    slowest = sorted(_LOAD_TIMES.items(), key=lambda kv: kv[1], reverse=True)[:3]
+    loads = ", ".join(f"{name} {sec * 1000:.1f} ms" for name, sec in slowest)
+    print(f"[timing] startup {startup * 1000:.1f} ms, total {total * 1000:.1f} ms; "
+          f"parsed {len(_LOAD_TIMES)} file(s) in {sum(_LOAD_TIMES.values()) * 1000:.1f} ms"
+          + (f" (slowest: {loads})" if loads else ""), file=sys.stderr)
 
 def main(argv=None):
     p = argparse.ArgumentParser()
@@ -120,37 +149,35 @@ def main(argv=None):
     p.add_argument("--list-child-langs", action="store_true", help="List available child prompt languages")
     p.add_argument("--phenomena", nargs="*", help="Aggregate phenomena counts across child prompts for LANG codes (default: all child languages)")
     p.add_argument("--child-metrics", nargs="*", help="Compute metrics for child prompts using gold_encodings_child.json (default: fr en)")
+    p.add_argument("--include-upserts", action="store_true", help="With --child-metrics, also count upserted annotations (gold_store.py --upsert)")
+    p.add_argument("--timing", action="store_true", help="Report startup time and parsed files on stderr")
     args = p.parse_args(argv)
+    startup = time.perf_counter() - _T0
 
-    corpus = load_json("toy_corpus.json")
-    gold = load_json("gold_encodings.json")
-    _inv = load_json("inventory_v0_1.json")  # reserved for future validation
-    sample = load_json("typological_sample.json")
-
+    # Artifacts are loaded lazily by the subcommands that need them
+    # (inventory_v0_1.json is reserved for future validation)
     if args.list:
-        list_sentences(corpus)
+        list_sentences(load_json("toy_corpus.json"))
     if args.metrics:
-        m = compute_metrics(corpus, gold)
+        m = compute_metrics(load_json("toy_corpus.json"), load_json("gold_encodings.json"))
         print(json.dumps(m, ensure_ascii=False, indent=2))
     if args.list_sample:
-        list_typological_sample(sample)
+        list_typological_sample(load_json("typological_sample.json"))
     if args.list_child:
         list_child_prompts(args.list_child)
     if args.list_child_langs:
         list_available_child_langs()
     if args.phenomena is not None:
-        if args.phenomena:
-            langs = args.phenomena
-        else:
-            base = os.path.join(HERE, "prompts_child")
-            langs = [os.path.splitext(fn)[0] for fn in os.listdir(base) if fn.endswith('.json') and fn != 'schema.json']
+        langs = args.phenomena if args.phenomena else child_langs()
         cnt = aggregate_phenomena(langs)
         print(json.dumps(cnt.most_common(), ensure_ascii=False, indent=2))
     if args.child_metrics is not None:
         langs = args.child_metrics if args.child_metrics else ["fr", "en"]
-        print(json.dumps(compute_child_metrics(langs), ensure_ascii=False, indent=2))
+        print(json.dumps(compute_child_metrics(langs, args.include_upserts), ensure_ascii=False, indent=2))
     if not args.list and not args.metrics and not args.list_sample and not args.list_child and not args.list_child_langs and args.phenomena is None and args.child_metrics is None:
         p.print_help()
+    if args.timing:
+        report_timing(startup)
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Lecture de corpus en flux pour les analyseurs dhātu
+Produit les phrases une à une, sans charger le corpus en mémoire :
+- JSONL : un objet par ligne (champ "text") ou une chaîne JSON par ligne
+- prompts_child : format {"lang": ..., "items": [{"id", "text", "phenomena"}]}
+- texte brut : une phrase par ligne non vide
+- répertoire .dhc : corpus pré-tokenisé (tokenized_corpus), lu par mmap
+Les fichiers .gz sont décompressés à la volée.
+"""
+
+import gzip
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROMPTS_CHILD_DIR = os.path.join(HERE, '..', 'experiments', 'dhatu', 'prompts_child')
+
+def _open_text(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def iter_jsonl_items(path: str, text_field: str = 'text') -> Iterator[Dict]:
+    """Objets d'un fichier JSONL, ligne par ligne (une chaîne devient {"text": ...})"""
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {text_field: item}
+            yield item
+
+def list_child_prompt_langs() -> List[str]:
+    """Codes des langues disponibles dans prompts_child (hors schema.json), triés"""
+    if not os.path.isdir(PROMPTS_CHILD_DIR):
+        return []
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(PROMPTS_CHILD_DIR)
+                  if name.endswith('.json') and name != 'schema.json')
+
+def iter_child_prompt_items(path_or_lang: str) -> Iterator[Dict]:
+    """Items d'un fichier prompts_child (chemin ou code langue)"""
+    path = path_or_lang
+    if not os.path.exists(path):
+        path = os.path.join(PROMPTS_CHILD_DIR, f"{path_or_lang}.json")
+    with _open_text(path) as f:
+        data = json.load(f)
+    for item in data.get('items', []):
+        yield item
+
+def iter_text_lines(path: str) -> Iterator[str]:
+    """Phrases d'un fichier texte brut, une par ligne non vide"""
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+def iter_items(path: str, text_field: str = 'text') -> Iterator[Dict]:
+    """Items d'un corpus, format déduit de l'extension (.jsonl, .json, sinon texte)
+
+    Un répertoire de corpus pré-tokenisé (voir tokenized_corpus) est lu par mmap.
+    """
+    if os.path.isdir(path):
+        from tokenized_corpus import TokenizedCorpus
+        return TokenizedCorpus(path).iter_items()
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.jsonl'):
+        return iter_jsonl_items(path, text_field)
+    if name.endswith('.json'):
+        return iter_child_prompt_items(path)
+    return ({text_field: line} for line in iter_text_lines(path))
+
+def iter_texts(path: str, text_field: str = 'text') -> Iterator[str]:
+    """Phrases d'un corpus, quel que soit son format"""
+    for item in iter_items(path, text_field):
+        yield item[text_field]
+
+def iter_chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Découpe un flux de phrases en lots de `size` phrases au plus"""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
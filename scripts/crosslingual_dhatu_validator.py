@@ -2,16 +2,22 @@
 # -*- coding: utf-8 -*-
 """
 Validation Cross-Linguistique avec 9 Dhātu Optimaux
-Test sur les 20 langues du dossier experiments/
+Test sur les langues du dossier experiments/dhatu/prompts_child/
 """
+import argparse
 import json
 import os
+import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from optimal_dhatu_analyzer import OptimalDhatuAnalyzer
+from tokenized_corpus import TokenizedCorpus
+from dhatu_match_cache import MatchCache
+from corpus_reader import PROMPTS_CHILD_DIR, list_child_prompt_langs
 
 def load_child_prompts(lang_code):
     """Charge les prompts d'une langue spécifique"""
-    prompts_path = f"../experiments/dhatu/prompts_child/{lang_code}.json"
+    prompts_path = os.path.join(PROMPTS_CHILD_DIR, f"{lang_code}.json")
     try:
         with open(prompts_path, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -19,58 +25,142 @@ def load_child_prompts(lang_code):
         print(f"⚠️  Language file not found: {lang_code}")
         return None
 
-def test_language_coverage(lang_code, analyzer):
-    """Teste la couverture pour une langue donnée"""
-    prompts_data = load_child_prompts(lang_code)
-    if not prompts_data:
-        return None
+def test_language_coverage(lang_code, analyzer, items=None, collect_results=False, results_sink=None):
+    """Teste la couverture pour une langue donnée
+
+    items : flux d'items {"id", "text", "phenomena"}, par exemple
+    corpus_reader.iter_items(chemin) pour un gros corpus JSONL ou
+    TokenizedCorpus.iter_items(lang) (items avec "tokens" précalculés) ;
+    par défaut, les items du fichier prompts_child de la langue.
+    Couverture, usage des dhātu et lacunes sont cumulés au fil du flux :
+    la mémoire ne dépend pas de la taille du corpus. Le détail par item
+    n'est gardé que sur demande (collect_results) ou écrit en JSONL dans
+    results_sink (fichier texte ouvert).
+    """
+    if items is None:
+        prompts_data = load_child_prompts(lang_code)
+        if not prompts_data:
+            return None
+        items = prompts_data['items']
     
-    results = []
+    results = [] if collect_results else None
+    total_sentences = 0
     total_coverage = 0
     dhatu_usage = {}
+    total_gaps = 0
+    sentences_with_gaps = 0
     
-    for item in prompts_data['items']:
+    for item in items:
         text = item['text']
-        phenomena = item['phenomena']
         
-        analysis = analyzer.analyze_text(text)
+        analysis = analyzer.analyze_text(text, tokens=item.get('tokens'), lang=lang_code)
         coverage = analysis['coverage_stats']['semantic_coverage']
+        total_sentences += 1
         total_coverage += coverage
         
         # Compter usage dhātu
         for dhatu, count in analysis['dhatu_distribution'].items():
             dhatu_usage[dhatu] = dhatu_usage.get(dhatu, 0) + count
         
-        results.append({
-            'id': item['id'],
+        gaps = analysis['semantic_gaps']
+        total_gaps += len(gaps)
+        if gaps:
+            sentences_with_gaps += 1
+        
+        if results is None and results_sink is None:
+            continue
+        detail = {
+            'id': item.get('id'),
             'text': text,
-            'phenomena': phenomena,
+            'phenomena': item.get('phenomena', []),
             'coverage': coverage,
             'dhatu_found': list(analysis['dhatu_distribution'].keys()),
-            'gaps': [gap.text for gap in analysis['semantic_gaps'][:3]]
-        })
+            'gaps': [gap.text for gap in gaps[:3]]
+        }
+        if results is not None:
+            results.append(detail)
+        if results_sink is not None:
+            results_sink.write(json.dumps(dict(detail, lang=lang_code), ensure_ascii=False) + '\n')
     
-    avg_coverage = total_coverage / len(results) if results else 0
+    avg_coverage = total_coverage / total_sentences if total_sentences else 0
     
-    return {
+    result = {
         'lang': lang_code,
         'avg_coverage': avg_coverage,
-        'total_sentences': len(results),
+        'total_sentences': total_sentences,
         'dhatu_usage': dhatu_usage,
-        'results': results
+        'total_gaps': total_gaps,
+        'sentences_with_gaps': sentences_with_gaps
     }
+    if results is not None:
+        result['results'] = results
+    return result
+
+_worker_state = None
+
+def _init_language_worker(analyzer, corpus_path, results_path):
+    """Initialise l'analyseur et le corpus d'un processus worker"""
+    global _worker_state
+    _worker_state = (analyzer, TokenizedCorpus(corpus_path) if corpus_path else None, results_path)
+
+def _counters(analyzer):
+    """Compteurs (memo, cache persistant) de l'analyseur"""
+    memo, cache = analyzer.memo, analyzer.match_cache
+    # Tests explicites : memo et cache vides sont faux (__len__)
+    memo_counts = (memo.hits, memo.misses) if memo is not None else (0, 0)
+    cache_counts = (cache.hits, cache.misses, cache.evictions) if cache is not None else (0, 0, 0)
+    return memo_counts + cache_counts
+
+def _results_part(results_path, lang):
+    """Fichier JSONL partiel d'une langue, fusionné ensuite dans results_path"""
+    return f"{results_path}.{lang}.part"
+
+def _validate_language(lang, analyzer=None, corpus=None, results_path=None):
+    """Valide une langue ; retourne (résultat, compteurs consommés, profil consommé)"""
+    if analyzer is None:
+        analyzer, corpus, results_path = _worker_state
+    before = _counters(analyzer)
+    profiler = analyzer.profiler
+    profile_before = profiler.snapshot() if profiler is not None else None
+    items = corpus.iter_items(lang) if corpus is not None and lang in corpus.languages else None
+    if results_path:
+        with open(_results_part(results_path, lang), 'w', encoding='utf-8') as sink:
+            result = test_language_coverage(lang, analyzer, items, results_sink=sink)
+    else:
+        result = test_language_coverage(lang, analyzer, items)
+    if analyzer.match_cache is not None:
+        analyzer.match_cache.commit()
+    counters = tuple(after - start for after, start in zip(_counters(analyzer), before))
+    profile = None
+    if profiler is not None:
+        profile = [tuple(after - start for after, start in zip(now, then))
+                   for now, then in zip(profiler.snapshot(), profile_before)]
+    return result, counters, profile
 
-def run_crosslingual_validation():
-    """Validation complète sur toutes les langues"""
+def run_crosslingual_validation(corpus_path=None, match_cache=None, memo_capacity=0,
+                                jobs=1, languages=None, profile=False, profile_json=None,
+                                results_path=None):
+    """Validation complète sur toutes les langues
+
+    corpus_path : corpus pré-tokenisé (tokenized_corpus) à utiliser à la
+    place des fichiers JSON prompts_child
+    match_cache : cache persistant des détections (dhatu_match_cache)
+    memo_capacity : taille du memo LRU de analyze_text (0 : désactivé)
+    jobs > 1 : les langues sont chargées et analysées sur un pool de
+    processus ; les résultats sont fusionnés dans l'ordre des langues,
+    d'où des résumés identiques au mode série.
+    languages : codes à valider (par défaut, tous ceux de prompts_child)
+    profile : profilage par pattern (dhatu_profiler), rapport en fin d'exécution
+    profile_json : fichier où exporter ce profil en JSON
+    results_path : fichier JSONL du détail par phrase (id, texte, couverture,
+    dhātu, lacunes), écrit au fil de l'eau ; les résultats retournés ne
+    contiennent que les totaux par langue
+    """
     
-    # 20 langues disponibles dans experiments/dhatu/prompts_child/
-    languages = [
-        'arb', 'cmn', 'deu', 'en', 'eus', 'ewe', 'fr', 'hau', 
-        'heb', 'hin', 'hun', 'iku', 'jpn', 'kor', 'nld', 
-        'spa', 'swa', 'tur', 'yor', 'zul'
-    ]
+    if languages is None:
+        languages = list_child_prompt_langs()
     
-    analyzer = OptimalDhatuAnalyzer()
+    analyzer = OptimalDhatuAnalyzer(match_cache=match_cache, memo_capacity=memo_capacity, profile=profile)
     all_results = {}
     
     print("🌍 VALIDATION CROSS-LINGUISTIQUE - 9 DHĀTU OPTIMAUX")
@@ -80,23 +170,60 @@ def run_crosslingual_validation():
     successful_langs = 0
     global_dhatu_usage = {}
     
-    for lang in languages:
-        print(f"\n🔍 Testing {lang.upper()}...")
-        result = test_language_coverage(lang, analyzer)
+    if jobs > 1 and len(languages) > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_language_worker,
+                                   initargs=(analyzer, corpus_path, results_path))
+        outcomes = pool.map(_validate_language, languages)
+    else:
+        pool = None
+        corpus = TokenizedCorpus(corpus_path) if corpus_path else None
+        outcomes = (_validate_language(lang, analyzer, corpus, results_path) for lang in languages)
+    
+    # Le pool est arrêté même si une langue échoue
+    try:
+        for lang, (result, counters, pattern_profile) in zip(languages, outcomes):
+            print(f"\n🔍 Testing {lang.upper()}...")
+            if pool is not None:
+                # Reporter les compteurs des workers sur le memo et le cache du processus principal
+                if analyzer.memo is not None:
+                    analyzer.memo.hits += counters[0]
+                    analyzer.memo.misses += counters[1]
+                if match_cache is not None:
+                    match_cache.hits += counters[2]
+                    match_cache.misses += counters[3]
+                    match_cache.evictions += counters[4]
+                if pattern_profile is not None:
+                    analyzer.profiler.add(pattern_profile)
         
-        if result:
-            all_results[lang] = result
-            total_global_coverage += result['avg_coverage']
-            successful_langs += 1
+            if result:
+                all_results[lang] = result
+                total_global_coverage += result['avg_coverage']
+                successful_langs += 1
             
-            # Agrégation usage dhātu global
-            for dhatu, count in result['dhatu_usage'].items():
-                global_dhatu_usage[dhatu] = global_dhatu_usage.get(dhatu, 0) + count
+                # Agrégation usage dhātu global
+                for dhatu, count in result['dhatu_usage'].items():
+                    global_dhatu_usage[dhatu] = global_dhatu_usage.get(dhatu, 0) + count
             
-            print(f"   ✅ Coverage: {result['avg_coverage']:.3f} ({result['total_sentences']} sentences)")
-            print(f"   🧬 Top Dhātu: {sorted(result['dhatu_usage'].items(), key=lambda x: x[1], reverse=True)[:3]}")
-        else:
-            print(f"   ❌ Failed to load language data")
+                print(f"   ✅ Coverage: {result['avg_coverage']:.3f} ({result['total_sentences']} sentences)")
+                print(f"   🧬 Top Dhātu: {sorted(result['dhatu_usage'].items(), key=lambda x: x[1], reverse=True)[:3]}")
+            else:
+                print(f"   ❌ Failed to load language data")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    
+    if pool is not None and match_cache is not None:
+        match_cache.refresh_size()
+    
+    if results_path:
+        # Fusion des fichiers partiels dans l'ordre des langues
+        with open(results_path, 'w', encoding='utf-8') as output:
+            for lang in languages:
+                part = _results_part(results_path, lang)
+                if os.path.exists(part):
+                    with open(part, 'r', encoding='utf-8') as f:
+                        shutil.copyfileobj(f, output)
+                    os.remove(part)
     
     # Statistiques globales
     global_avg_coverage = total_global_coverage / successful_langs if successful_langs > 0 else 0
@@ -140,11 +267,45 @@ def run_crosslingual_validation():
             family_avg = sum(family_results) / len(family_results)
             print(f"{family}: {family_avg:.3f} ({len(family_results)} langues)")
     
+    if analyzer.memo is not None:
+        stats = analyzer.memo.stats()
+        print(f"\n🧠 Memo analyze_text: {stats['hits']} hits / {stats['misses']} misses ({analyzer.memo.hit_ratio:.1%})")
+    
+    if analyzer.profiler is not None:
+        print(f"\n{analyzer.profiler.report()}")
+        if profile_json:
+            analyzer.profiler.export_json(profile_json)
+            print(f"💾 Profil exporté: {profile_json}")
+    
     return all_results, global_avg_coverage
 
 if __name__ == "__main__":
-    results, coverage = run_crosslingual_validation()
+    parser = argparse.ArgumentParser(description="Validation cross-linguistique des 9 dhātu")
+    parser.add_argument('--corpus', help="Corpus pré-tokenisé (.dhc) construit par tokenized_corpus.py")
+    parser.add_argument('--cache', nargs='?', const='', metavar='FICHIER',
+                        help="Cache SQLite des détections (défaut : $DHATU_CACHE_DIR ou ~/.cache/paninifs_dhatu)")
+    parser.add_argument('--cache-max-mb', type=int, default=64, help="Taille maximale du cache (Mo)")
+    parser.add_argument('--memo', type=int, default=0, metavar='N',
+                        help="Mémoïse analyze_text pour N textes distincts (0 : désactivé)")
+    parser.add_argument('--jobs', type=int, default=1, help="Processus pour valider les langues en parallèle")
+    parser.add_argument('--lang', action='append', help="Langue à valider (répétable, défaut : toutes)")
+    parser.add_argument('--profile', nargs='?', const='', metavar='JSON',
+                        help="Profil par pattern (temps, appels, détections), exporté en JSON si un fichier est donné")
+    parser.add_argument('--results', metavar='JSONL',
+                        help="Écrit le détail par phrase (couverture, dhātu, lacunes) en JSONL")
+    args = parser.parse_args()
+    match_cache = None
+    if args.cache is not None:
+        match_cache = MatchCache(args.cache or None, max_bytes=args.cache_max_mb * 1024 * 1024)
+    results, coverage = run_crosslingual_validation(args.corpus, match_cache, args.memo,
+                                                    jobs=args.jobs, languages=args.lang,
+                                                    profile=args.profile is not None,
+                                                    profile_json=args.profile or None,
+                                                    results_path=args.results)
     
     print(f"\n✅ VALIDATION TERMINÉE")
     print(f"🎯 Couverture globale 9 dhātu: {coverage:.1%}")
     print(f"📊 Objectif >70%: {'✅ ATTEINT' if coverage > 0.70 else '⚠️ En cours'}")
+    if match_cache is not None:
+        print(match_cache.report())
+        match_cache.close()
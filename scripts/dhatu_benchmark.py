@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmarks des analyseurs et de l'optimiseur dhātu
+Génère un corpus synthétique à partir des items prompts_child (10² à 10⁶
+phrases) et mesure, pour chaque cible : débit, percentiles de latence et pic
+mémoire (tracemalloc). Le rapport JSON permet de comparer deux commits :
+--compare signale les régressions de débit au-delà d'un seuil.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+from corpus_reader import iter_child_prompt_items, list_child_prompt_langs
+from semantic_coverage_analyzer import SemanticCoverageAnalyzer
+from optimal_dhatu_analyzer import OptimalDhatuAnalyzer
+from dhatu_set_optimizer import DhatuSetOptimizer
+from crosslingual_dhatu_validator import test_language_coverage
+from dhatu_tokenizer import WORD_PATTERN
+
+BENCHMARKS = ('semantic_analyze_text', 'optimal_analyze_text', 'optimizer', 'crosslingual')
+DEFAULT_SIZES = (100, 1000)
+MAX_SIZE = 10 ** 6
+
+def generate_synthetic_corpus(size: int, seed: int = 0, langs: List[str] = None) -> Iterator[Dict]:
+    """Items synthétiques {"id", "text", "phenomena", "lang"}, en flux et déterministes
+
+    Les items prompts_child sont d'abord repris tels quels, puis combinés :
+    1 à 3 phrases d'une même langue tirées au hasard et juxtaposées. Les
+    items sans aucun mot (rien à analyser) sont écartés.
+    """
+    rng = random.Random(seed)
+    by_lang = {lang: [item for item in iter_child_prompt_items(lang) if WORD_PATTERN.search(item['text'])]
+               for lang in (langs or list_child_prompt_langs())}
+    by_lang = {lang: items for lang, items in by_lang.items() if items}
+    base = [(lang, item) for lang, items in by_lang.items() for item in items]
+    if not base:
+        return
+    for i in range(size):
+        if i < len(base):
+            lang, item = base[i]
+            text, phenomena = item['text'], item.get('phenomena', [])
+        else:
+            lang = rng.choice(list(by_lang))
+            picked = [rng.choice(by_lang[lang]) for _ in range(rng.randint(1, 3))]
+            text = ' '.join(p['text'] for p in picked)
+            phenomena = sorted({ph for p in picked for ph in p.get('phenomena', [])})
+        yield {'id': f"{lang}-syn-{i}", 'text': text, 'phenomena': phenomena, 'lang': lang}
+
+def _percentiles(latencies: array) -> Dict[str, float]:
+    """Percentiles en microsecondes"""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1000, 2)
+    return {'p50': at(0.50), 'p90': at(0.90), 'p99': at(0.99), 'max': round(ordered[-1] / 1000, 2)}
+
+def _measure(run: Callable[[], array], sentences: int, memory: bool) -> Dict:
+    """Exécute run (qui retourne ses latences en ns) : chrono, puis passe tracée"""
+    start = time.perf_counter()
+    latencies = run()
+    seconds = time.perf_counter() - start
+    result = {
+        'sentences': sentences,
+        'seconds': round(seconds, 4),
+        'throughput_per_s': round(sentences / seconds, 1) if seconds > 0 else None,
+        'latency_us': _percentiles(latencies)
+    }
+    if memory:
+        # Passe séparée : tracemalloc ralentit l'exécution et fausserait le chrono
+        tracemalloc.start()
+        run()
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+def _analyze_each(analyzer, texts: List[str]) -> Callable[[], array]:
+    def run() -> array:
+        latencies = array('q')
+        clock = time.perf_counter_ns
+        for text in texts:
+            start = clock()
+            analyzer.analyze_text(text)
+            latencies.append(clock() - start)
+        return latencies
+    return run
+
+def bench_semantic_analyze_text(items: List[Dict], memory: bool) -> Dict:
+    analyzer = SemanticCoverageAnalyzer()
+    analyzer.pattern_bank  # compilation hors mesure
+    return _measure(_analyze_each(analyzer, [item['text'] for item in items]), len(items), memory)
+
+def bench_optimal_analyze_text(items: List[Dict], memory: bool) -> Dict:
+    analyzer = OptimalDhatuAnalyzer()
+    analyzer.pattern_bank
+    return _measure(_analyze_each(analyzer, [item['text'] for item in items]), len(items), memory)
+
+def bench_optimizer(items: List[Dict], memory: bool) -> Dict:
+    texts = [item['text'] for item in items]
+    def run() -> array:
+        optimizer = DhatuSetOptimizer()  # cache d'incidence vide à chaque passe
+        start = time.perf_counter_ns()
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimizer.find_minimal_optimal_set(target_coverage=80.0, max_dhatu=12, test_corpus=texts)
+        return array('q', [time.perf_counter_ns() - start])
+    return _measure(run, len(items), memory)
+
+def bench_crosslingual(items: List[Dict], memory: bool) -> Dict:
+    by_lang = defaultdict(list)
+    for item in items:
+        by_lang[item['lang']].append(item)
+    def run() -> array:
+        analyzer = OptimalDhatuAnalyzer()
+        latencies = array('q')
+        for lang, lang_items in by_lang.items():
+            start = time.perf_counter_ns()
+            test_language_coverage(lang, analyzer, lang_items)
+            latencies.append(time.perf_counter_ns() - start)  # latence par langue
+        return latencies
+    result = _measure(run, len(items), memory)
+    result['languages'] = len(by_lang)
+    return result
+
+_RUNNERS = {
+    'semantic_analyze_text': bench_semantic_analyze_text,
+    'optimal_analyze_text': bench_optimal_analyze_text,
+    'optimizer': bench_optimizer,
+    'crosslingual': bench_crosslingual
+}
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def run_benchmarks(sizes=DEFAULT_SIZES, benchmarks=BENCHMARKS, seed: int = 0, memory: bool = True) -> Dict:
+    """Exécute les benchmarks demandés pour chaque taille de corpus"""
+    results = []
+    for size in sizes:
+        if not 1 <= size <= MAX_SIZE:
+            raise ValueError(f"Taille de corpus hors limites: {size} (1 à {MAX_SIZE})")
+        items = list(generate_synthetic_corpus(size, seed))
+        for name in benchmarks:
+            print(f"⏱️  {name} — {size} phrases...", file=sys.stderr)
+            result = {'benchmark': name, 'size': size}
+            result.update(_RUNNERS[name](items, memory))
+            results.append(result)
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'sizes': list(sizes)
+        },
+        'results': results
+    }
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """Régressions de débit (baisse relative > threshold) entre deux rapports"""
+    reference = {(r['benchmark'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        before = reference.get((result['benchmark'], result['size']))
+        if not before or not before.get('throughput_per_s') or not result.get('throughput_per_s'):
+            continue
+        change = result['throughput_per_s'] / before['throughput_per_s'] - 1
+        if change < -threshold:
+            regressions.append(f"{result['benchmark']} ({result['size']} phrases): "
+                               f"{before['throughput_per_s']} → {result['throughput_per_s']} phrases/s ({change:+.1%})")
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks des analyseurs dhātu")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Tailles du corpus synthétique (10² à 10⁶)")
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="Sans la passe tracemalloc")
+    parser.add_argument('--output', help="Fichier JSON du rapport (sinon sortie standard)")
+    parser.add_argument('--compare', help="Rapport de référence : signale les régressions de débit")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Baisse de débit tolérée (0.10 = 10 %%)")
+    parser.add_argument('--write-corpus', metavar='JSONL',
+                        help="Écrit seulement le corpus synthétique (première taille) en JSONL")
+    args = parser.parse_args(argv)
+
+    if args.write_corpus:
+        with open(args.write_corpus, 'w', encoding='utf-8') as f:
+            for item in generate_synthetic_corpus(args.sizes[0], args.seed):
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        print(f"✅ {args.sizes[0]} phrases → {args.write_corpus}", file=sys.stderr)
+        return 0
+
+    report = run_benchmarks(args.sizes, args.benchmarks, args.seed, memory=not args.no_memory)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"⚠️  Régression: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("✅ Aucune régression de débit", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,13 @@ Générateur de Dhātu Candidats pour PaniniFS
 Analyse les gaps sémantiques et propose de nouveaux dhātu pour améliorer la couverture
 """
 
+import argparse
 import json
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Set, Sized, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from corpus_reader import iter_chunks, iter_texts
 from semantic_coverage_analyzer import SemanticCoverageAnalyzer, SemanticGap
 
 @dataclass
@@ -21,6 +24,63 @@ class DhatuCandidate:
     coverage_improvement: float  # Estimation du gain de couverture
     priority: int  # 1 = haute, 3 = basse
 
+# Agrégat partiel mergeable : (fréquence par catégorie, exemples uniques par catégorie)
+GapPartial = Tuple[Counter, Dict[str, Dict[str, None]]]
+
+_worker_analyzer = None
+
+def _init_gap_worker(analyzer: SemanticCoverageAnalyzer):
+    """Initialise l'analyseur d'un processus worker (une fois par processus)"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+def _gap_partial(texts: List[str], analyzer: SemanticCoverageAnalyzer = None) -> GapPartial:
+    """Calcule les agrégats de gaps d'un lot de textes"""
+    analyzer = analyzer or _worker_analyzer
+    frequency = Counter()
+    # dict plutôt que set : exemples uniques dans l'ordre d'apparition
+    examples = defaultdict(dict)
+    for text in texts:
+        for gap in analyzer._detect_semantic_gaps(text):
+            frequency[gap.semantic_category] += 1
+            examples[gap.semantic_category].setdefault(gap.text_fragment)
+    return frequency, dict(examples)
+
+class _CountingIterator:
+    """Itérateur qui compte les textes consommés (longueur d'un flux)"""
+
+    def __init__(self, texts: Iterable[str]):
+        self._texts = iter(texts)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        text = next(self._texts)
+        self.count += 1
+        return text
+
+def _bounded_map(pool: ProcessPoolExecutor, fn, items: Iterable, max_pending: int) -> Iterator:
+    """Comme pool.map, mais ne soumet que max_pending tâches d'avance"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def _merge_gap_partials(partials) -> GapPartial:
+    """Fusionne les agrégats dans l'ordre des lots : résultat identique au mode série"""
+    frequency = Counter()
+    examples = defaultdict(dict)
+    for part_frequency, part_examples in partials:
+        frequency.update(part_frequency)
+        for category, fragments in part_examples.items():
+            examples[category].update(fragments)
+    return frequency, examples
+
 class DhatuCandidateGenerator:
     """Génère des candidats dhātu basés sur l'analyse des gaps"""
     
@@ -125,32 +185,42 @@ class DhatuCandidateGenerator:
             }
         }
     
-    def analyze_corpus_for_gaps(self, texts: List[str]) -> Dict:
-        """Analyse un corpus pour identifier les gaps sémantiques principaux"""
-        
-        all_gaps = []
-        gap_frequency = defaultdict(int)
-        gap_examples = defaultdict(list)
+    def analyze_corpus_for_gaps(self, texts: Iterable[str], jobs: int = 1, chunk_size: int = 1000) -> Dict:
+        """Analyse un corpus pour identifier les gaps sémantiques principaux
+
+        texts peut être une liste ou un flux (voir corpus_reader) : le corpus
+        est consommé lot par lot, sans être matérialisé. jobs > 1 répartit
+        les lots de chunk_size textes sur un pool de processus, avec au plus
+        2 × jobs lots en vol ; les agrégats partiels sont fusionnés dans
+        l'ordre, si bien que le résultat est identique au mode série.
+        """
         
-        print(f"🔍 Analyse de {len(texts)} textes pour identifier les gaps...")
+        if isinstance(texts, Sized):
+            print(f"🔍 Analyse de {len(texts)} textes pour identifier les gaps...")
+        else:
+            print("🔍 Analyse du corpus en flux pour identifier les gaps...")
         
-        for text in texts:
-            result = self.analyzer.analyze_text(text)
-            
-            for gap in result['semantic_gaps']:
-                all_gaps.append(gap)
-                gap_frequency[gap.semantic_category] += 1
-                gap_examples[gap.semantic_category].append(gap.text_fragment)
+        counter = _CountingIterator(texts)
+        chunks = iter_chunks(counter, chunk_size)
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_gap_worker,
+                                     initargs=(self.analyzer,)) as pool:
+                partials = _bounded_map(pool, _gap_partial, chunks, 2 * jobs)
+                gap_frequency, gap_examples = _merge_gap_partials(partials)
+        else:
+            partials = (_gap_partial(chunk, self.analyzer) for chunk in chunks)
+            gap_frequency, gap_examples = _merge_gap_partials(partials)
+        total_texts = counter.count
         
         # Trier par fréquence pour identifier les gaps prioritaires
         sorted_gaps = sorted(gap_frequency.items(), key=lambda x: x[1], reverse=True)
         
         return {
-            'total_gaps': len(all_gaps),
+            'total_gaps': sum(gap_frequency.values()),
             'gap_frequency': dict(gap_frequency),
-            'gap_examples': {k: list(set(v)) for k, v in gap_examples.items()},
+            'gap_examples': {k: list(v) for k, v in gap_examples.items()},
             'priority_order': sorted_gaps,
-            'analysis_summary': self._generate_gap_analysis_summary(sorted_gaps, len(texts))
+            'analysis_summary': self._generate_gap_analysis_summary(sorted_gaps, total_texts)
         }
     
     def generate_dhatu_candidates(self, gap_analysis: Dict) -> List[DhatuCandidate]:
@@ -256,8 +326,12 @@ class DhatuCandidateGenerator:
             'efficiency_ratio': round(current_coverage / len(optimized_set), 2)
         }
 
-def main():
+def main(argv: List[str] = None):
     """Fonction de test et démonstration"""
+    parser = argparse.ArgumentParser(description="Générateur de dhātu candidats")
+    parser.add_argument('--corpus', help="Corpus à analyser en flux (.jsonl, .json prompts_child ou texte, éventuellement .gz)")
+    parser.add_argument('--jobs', type=int, default=1, help="Processus pour l'analyse des gaps")
+    args = parser.parse_args(argv)
     generator = DhatuCandidateGenerator()
     
     # Corpus de test étendu pour identifier les gaps
@@ -279,7 +353,8 @@ def main():
     
     # Étape 1: Analyser les gaps dans le corpus
     print("\n📊 ANALYSE DES GAPS SÉMANTIQUES")
-    gap_analysis = generator.analyze_corpus_for_gaps(test_corpus)
+    corpus = iter_texts(args.corpus) if args.corpus else test_corpus
+    gap_analysis = generator.analyze_corpus_for_gaps(corpus, jobs=args.jobs)
     
     print(f"Total gaps identifiés: {gap_analysis['total_gaps']}")
     print(f"Catégories affectées: {len(gap_analysis['gap_frequency'])}")
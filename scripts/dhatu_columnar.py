@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Résultats d'analyse en colonnes pour les lots de textes
+Au lieu d'un dict de dataclasses par phrase, un lot produit des tableaux
+plats (array) : couverture par texte, matrice textes × dhātu, offsets
+des détections. Les agrégats deviennent de simples réductions.
+"""
+
+from array import array
+from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+
+def _int_array() -> array:
+    return array('l')
+
+@dataclass
+class ColumnarAnalysis:
+    """Lot de textes analysés, stocké en colonnes"""
+    dhatu_names: Tuple[str, ...]
+    gap_names: Tuple[str, ...] = ()
+    coverage: array = field(default_factory=lambda: array('d'))  # par texte
+    dhatu_counts: array = field(default_factory=_int_array)  # textes × dhātu, ligne par ligne
+    gap_counts: array = field(default_factory=_int_array)  # textes × catégories de gap
+    gap_totals: array = field(default_factory=_int_array)  # gaps par texte
+    # Détections à plat : une entrée par match
+    match_text: array = field(default_factory=_int_array)
+    match_dhatu: array = field(default_factory=_int_array)
+    match_start: array = field(default_factory=_int_array)
+    match_end: array = field(default_factory=_int_array)
+
+    def __len__(self) -> int:
+        return len(self.coverage)
+
+    def mean_coverage(self) -> float:
+        return sum(self.coverage) / len(self.coverage) if self.coverage else 0
+
+    def dhatu_column(self, dhatu: str) -> array:
+        """Nombre de détections d'un dhātu, texte par texte"""
+        width = len(self.dhatu_names)
+        return self.dhatu_counts[self.dhatu_names.index(dhatu)::width]
+
+    def dhatu_totals(self) -> Dict[str, int]:
+        """Nombre total de détections par dhātu sur le lot"""
+        width = len(self.dhatu_names)
+        return {name: sum(self.dhatu_counts[j::width]) for j, name in enumerate(self.dhatu_names)}
+
+    def gap_totals_by_category(self) -> Dict[str, int]:
+        width = len(self.gap_names)
+        return {name: sum(self.gap_counts[j::width]) for j, name in enumerate(self.gap_names)}
+
+    def dhatu_row(self, index: int) -> Dict[str, int]:
+        """Distribution des dhātu (non nuls) d'un texte du lot"""
+        width = len(self.dhatu_names)
+        row = self.dhatu_counts[index * width:(index + 1) * width]
+        return {name: count for name, count in zip(self.dhatu_names, row) if count}
+
+    def present_dhatu(self) -> List[str]:
+        """Dhātu détectés au moins une fois dans le lot"""
+        return [name for name, total in self.dhatu_totals().items() if total]
+
+    def present_gaps(self) -> List[str]:
+        return [name for name, total in self.gap_totals_by_category().items() if total]
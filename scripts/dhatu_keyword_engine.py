@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Moteur de mots-clés Aho-Corasick pour les vocabulaires dhātu littéraux
+La plupart des patterns sont des alternations \\b(mot|mot|...)\\b : on en
+extrait les mots-clés et on les cherche en temps linéaire dans le texte,
+indépendamment de la taille du vocabulaire
+
+L'équivalence IGNORECASE du moteur re est reproduite avec des API privées
+(_sre.unicode_tolower, re._casefix) : si elles manquent (autre version ou
+implémentation de Python), CASE_FOLDING_AVAILABLE est faux et les banques
+insensibles à la casse restent sur le moteur regex.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+from collections import deque
+from functools import lru_cache
+
+try:
+    from _sre import unicode_tolower as _unicode_tolower
+    try:
+        from re._casefix import _EXTRA_CASES  # Python >= 3.11
+    except ImportError:  # pragma: no cover
+        from sre_compile import _ignorecase_fixes as _EXTRA_CASES
+except ImportError:  # pragma: no cover
+    _unicode_tolower = _EXTRA_CASES = None
+
+CASE_FOLDING_AVAILABLE = _unicode_tolower is not None
+
+# \b(alternatives) suivi de \b ou \w*
+_LITERAL_PATTERN = re.compile(r'^\\b\((?P<alts>.*)\)(?P<tail>\\b|\\w\*)$', re.DOTALL)
+_REGEX_METACHARS = set('.^$*+?{}[]|()\\')
+
+TAIL_BOUNDARY = 'boundary'  # \b : le mot-clé doit finir sur une frontière de mot
+TAIL_WORD = 'word'  # \w* : la détection s'étend jusqu'à la fin du mot
+
+@dataclass(frozen=True)
+class LiteralVocabulary:
+    """Vocabulaire littéral extrait d'un pattern regex"""
+    keywords: Tuple[str, ...]  # dans l'ordre de préférence de la regex
+    tail: str
+
+@lru_cache(maxsize=None)
+def extract_literal_vocabulary(source: str) -> Optional[LiteralVocabulary]:
+    """Extrait les mots-clés d'un pattern \\b(a|b|c)\\b, ou None s'il n'est pas littéral"""
+    match = _LITERAL_PATTERN.match(source)
+    if not match:
+        return None
+    keywords = []
+    for alternative in _split_alternatives(match.group('alts')):
+        variants = _expand_alternative(alternative)
+        if not variants:
+            return None
+        keywords.extend(variants)
+    tail = TAIL_BOUNDARY if match.group('tail') == r'\b' else TAIL_WORD
+    return LiteralVocabulary(tuple(keywords), tail)
+
+def _split_alternatives(alts: str) -> List[str]:
+    """Découpe sur les | non échappés"""
+    parts, current, escaped = [], [], False
+    for ch in alts:
+        if escaped:
+            current.append('\\' + ch)
+            escaped = False
+        elif ch == '\\':
+            escaped = True
+        elif ch == '|':
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(ch)
+    if escaped:
+        current.append('\\')
+    parts.append(''.join(current))
+    return parts
+
+def _expand_alternative(alternative: str) -> Optional[List[str]]:
+    """Développe une alternative littérale (avec 'x?') en variantes, ordre glouton"""
+    variants = ['']
+    i = 0
+    while i < len(alternative):
+        ch = alternative[i]
+        if ch == '\\':
+            if i + 1 >= len(alternative) or alternative[i + 1].isalnum():
+                return None  # \w, \d, \b... : pas un littéral
+            ch = alternative[i + 1]
+            i += 2
+        elif ch in _REGEX_METACHARS:
+            return None
+        else:
+            i += 1
+        if i < len(alternative) and alternative[i] == '?':
+            # Quantificateur glouton : la variante avec le caractère d'abord
+            variants = [v + suffix for v in variants for suffix in (ch, '')]
+            i += 1
+        else:
+            variants = [v + ch for v in variants]
+    if any(not v for v in variants):
+        return None  # une alternative vide changerait la sémantique
+    return variants
+
+class _CaseFold(dict):
+    """Table str.translate : chaque caractère vers son représentant IGNORECASE"""
+
+    def __missing__(self, code: int) -> int:
+        # Même équivalence que le moteur re : minuscule simple + cas spéciaux (ı, ſ, ...)
+        lower = _unicode_tolower(code)
+        folded = min((lower,) + tuple(_EXTRA_CASES.get(lower, ())))
+        self[code] = folded
+        return folded
+
+_CASE_FOLD = _CaseFold()
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+class KeywordAutomaton:
+    """Automate Aho-Corasick sur un ensemble de mots-clés"""
+
+    def __init__(self, keywords: List[str], ignore_case: bool = True):
+        self.ignore_case = ignore_case
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        outputs: List[List[int]] = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in self._fold(keyword):
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword_id)
+        # Liens d'échec en largeur ; les sorties héritent de celles du lien
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+        self._output = [tuple(out) for out in outputs]
+        self._lengths = [len(keyword) for keyword in self.keywords]
+
+    def _fold(self, text: str) -> str:
+        return text.translate(_CASE_FOLD) if self.ignore_case else text
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Génère (début, id du mot-clé) pour chaque occurrence, chevauchements compris"""
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        state = 0
+        for i, ch in enumerate(self._fold(text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_id in output[state]:
+                yield i + 1 - lengths[keyword_id], keyword_id
+
+class KeywordMatcher:
+    """Applique plusieurs vocabulaires littéraux avec la sémantique de re.finditer"""
+
+    def __init__(self, vocabularies: Dict[int, LiteralVocabulary], ignore_case: bool = True):
+        # vocabularies : {index de pattern dans la banque: vocabulaire}
+        self.vocabularies = dict(vocabularies)
+        keyword_ids: Dict[str, int] = {}
+        # Pour chaque mot-clé : [(index de pattern, rang de préférence), ...]
+        self._targets: List[List[Tuple[int, int]]] = []
+        for pattern_index, vocabulary in self.vocabularies.items():
+            for rank, keyword in enumerate(vocabulary.keywords):
+                keyword_id = keyword_ids.setdefault(keyword, len(keyword_ids))
+                if keyword_id == len(self._targets):
+                    self._targets.append([])
+                self._targets[keyword_id].append((pattern_index, rank))
+        self.automaton = KeywordAutomaton(list(keyword_ids), ignore_case)
+
+    def __len__(self) -> int:
+        return len(self.automaton.keywords)
+
+    def scan(self, text: str) -> List[Tuple[int, int, int]]:
+        """Retourne les détections (index de pattern, début, fin)"""
+        n = len(text)
+        # Meilleur candidat par (pattern, début) : (rang, fin)
+        best: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        lengths = self.automaton._lengths
+        for start, keyword_id in self.automaton.find_all(text):
+            # \b initial
+            before = start > 0 and _is_word(text[start - 1])
+            if before == _is_word(text[start]):
+                continue
+            end = start + lengths[keyword_id]
+            for pattern_index, rank in self._targets[keyword_id]:
+                key = (pattern_index, start)
+                if key in best and best[key][0] < rank:
+                    continue
+                if self.vocabularies[pattern_index].tail == TAIL_BOUNDARY:
+                    after = end < n and _is_word(text[end])
+                    if after == _is_word(text[end - 1]):
+                        continue
+                    match_end = end
+                else:
+                    match_end = end
+                    while match_end < n and _is_word(text[match_end]):
+                        match_end += 1
+                best[key] = (rank, match_end)
+        # Non-chevauchement par pattern, de gauche à droite, comme re.finditer
+        hits = []
+        last_end: Dict[int, int] = {}
+        for (pattern_index, start), (_, end) in sorted(best.items(), key=lambda item: item[0][1]):
+            if start >= last_end.get(pattern_index, 0):
+                hits.append((pattern_index, start, end))
+                last_end[pattern_index] = end
+        hits.sort(key=lambda hit: (hit[1], hit[0]))
+        return hits
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Cache persistant des détections de la banque de patterns (SQLite)
+Associe (hash du texte, empreinte de la banque) aux spans détectés :
+relancer une validation sur des textes et des patterns inchangés ne
+refait plus le scan. Taille bornée : au-delà de max_bytes, les entrées
+les moins récemment utilisées (LRU) sont évincées par petits lots. Un hit
+ne fait qu'une lecture : sa date d'usage est gardée en mémoire et écrite
+par lots (commit, close, éviction). Un hit coûte une requête indexée :
+sur une phrase courte, c'est à peu près un rescan ; le gain vient des
+textes plus longs et des banques plus lourdes.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from array import array
+from typing import Dict, List, Optional
+from dhatu_pattern_bank import BankHit
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'paninifs_dhatu')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Plusieurs processus (workers d'un pool) peuvent écrire dans le même fichier :
+# transactions courtes (commit par petits lots) et attente du verrou
+DEFAULT_COMMIT_EVERY = 100
+DEFAULT_TIMEOUT = 30.0
+# Octets comptés par entrée en plus des spans : hash, empreinte, index
+_ROW_OVERHEAD = 128
+# Entrées lues par requête d'éviction (mémoire bornée, quelle que soit la taille du cache)
+_EVICT_BATCH = 256
+# Dates d'usage des hits gardées en mémoire avant écriture groupée
+_TOUCH_BATCH = 1000
+
+def text_digest(text: str) -> bytes:
+    """Hash du texte (surrogatepass : accepte toute chaîne Python)"""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+class MatchCache:
+    """Cache SQLite (hash du texte, empreinte de banque) -> détections"""
+
+    def __init__(self, path: str = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 commit_every: int = DEFAULT_COMMIT_EVERY, timeout: float = DEFAULT_TIMEOUT):
+        if path is None:
+            path = os.path.join(os.environ.get('DHATU_CACHE_DIR', DEFAULT_CACHE_DIR), 'matches.sqlite')
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.commit_every = commit_every
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pending = 0
+        # id -> dernier usage (ns) des hits pas encore écrits : un hit reste une simple lecture
+        self._touched: Dict[int, int] = {}
+        # timeout : attente (busy_timeout) quand un autre processus tient le verrou d'écriture
+        self._connection = sqlite3.connect(path, timeout=timeout)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('''
+            CREATE TABLE IF NOT EXISTS matches (
+                id INTEGER PRIMARY KEY,
+                text_hash BLOB NOT NULL,
+                fingerprint TEXT NOT NULL,
+                spans BLOB NOT NULL,
+                UNIQUE (text_hash, fingerprint)
+            )''')
+        columns = [row[1] for row in self._connection.execute('PRAGMA table_info(matches)')]
+        if 'last_used' not in columns:
+            # Caches créés avant l'éviction LRU : l'ordre d'insertion sert de départ
+            self._connection.execute('ALTER TABLE matches ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS matches_lru ON matches (last_used, id)')
+        self._connection.commit()
+        self.refresh_size()
+
+    def refresh_size(self):
+        """Relit la taille du cache (après écritures d'autres processus)"""
+        row = self._connection.execute(
+            'SELECT COALESCE(SUM(LENGTH(spans) + ?), 0) FROM matches', (_ROW_OVERHEAD,)).fetchone()
+        self._size = row[0]
+
+    def __reduce__(self):
+        # Un worker rouvre sa propre connexion sur le même fichier
+        return (MatchCache, (self.path, self.max_bytes, self.commit_every, self.timeout))
+
+    def get(self, text: str, fingerprint: str) -> Optional[List[BankHit]]:
+        """Détections en cache pour ce texte et cette banque, ou None"""
+        row = self._connection.execute(
+            'SELECT id, spans FROM matches WHERE text_hash = ? AND fingerprint = ?',
+            (text_digest(text), fingerprint)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[row[0]] = time.time_ns()
+        if len(self._touched) >= _TOUCH_BATCH:
+            self.commit()
+        flat = array('l')
+        flat.frombytes(row[1])
+        return list(zip(flat[0::3], flat[1::3], flat[2::3]))
+
+    def put(self, text: str, fingerprint: str, hits: List[BankHit]):
+        spans = array('l', (value for hit in hits for value in hit)).tobytes()
+        cursor = self._connection.execute(
+            'INSERT OR IGNORE INTO matches (text_hash, fingerprint, spans, last_used) VALUES (?, ?, ?, ?)',
+            (text_digest(text), fingerprint, spans, time.time_ns()))
+        if cursor.rowcount:
+            self._size += len(spans) + _ROW_OVERHEAD
+        if self._size > self.max_bytes:
+            self._evict()
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % de max_bytes
+
+        Lots de _EVICT_BATCH entrées lus sur l'index (last_used, id) :
+        jamais la table entière en mémoire.
+        """
+        target = self.max_bytes * 9 // 10
+        self._flush_touched()  # l'ordre LRU doit voir les hits récents
+        while self._size > target:
+            rows = self._connection.execute(
+                'SELECT id, LENGTH(spans) + ? FROM matches ORDER BY last_used, id LIMIT ?',
+                (_ROW_OVERHEAD, _EVICT_BATCH)).fetchall()
+            if not rows:
+                self._size = 0  # taille estimée décalée (autre processus) : le cache est vide
+                return
+            evicted = []
+            for row_id, size in rows:
+                if self._size <= target:
+                    break
+                self._size -= size
+                evicted.append((row_id,))
+            self._connection.executemany('DELETE FROM matches WHERE id = ?', evicted)
+            self.evictions += len(evicted)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._connection.executemany('UPDATE matches SET last_used = ? WHERE id = ?',
+                                         ((used, row_id) for row_id, used in self._touched.items()))
+            self._touched.clear()
+
+    def commit(self):
+        """Écrit les dates d'usage en attente et valide la transaction"""
+        self._flush_touched()
+        self._connection.commit()
+        self._pending = 0
+
+    def clear(self):
+        self._touched.clear()
+        self._connection.execute('DELETE FROM matches')
+        self._size = 0
+        self.commit()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM matches').fetchone()[0]
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio, 4),
+            'evictions': self.evictions,
+            'size_bytes': self._size,
+            'max_bytes': self.max_bytes
+        }
+
+    def report(self) -> str:
+        return (f"💾 Cache de détections: {self.hits} hits / {self.misses} misses "
+                f"({self.hit_ratio:.1%}), {self.evictions} évictions, "
+                f"{self._size / 1024:.0f} Ko / {self.max_bytes / 1024:.0f} Ko")
+
+    def close(self):
+        if self._connection is not None:
+            self.commit()
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
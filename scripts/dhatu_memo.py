@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Mémoïsation bornée (LRU) des analyses de texte
+Les corpus d'adresse à l'enfant répètent sans cesse les mêmes énoncés :
+analyze_text peut réutiliser le résultat d'un texte déjà vu. Les résultats
+mis en cache sont figés (dict -> FrozenDict, list -> tuple) pour qu'un
+appelant ne puisse pas corrompre le cache ; ils restent sérialisables en
+JSON comme le résultat d'origine.
+"""
+
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, Optional
+
+DEFAULT_CAPACITY = 10000
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"'{type(self).__name__}' est en lecture seule")
+
+class FrozenDict(dict):
+    """dict en lecture seule : json, pickle et == le traitent comme un dict"""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+def freeze(value: Any) -> Any:
+    """Copie en lecture seule d'un résultat d'analyse"""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, (dict, MappingProxyType)):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class AnalysisMemo:
+    """Cache LRU texte -> résultat figé, de capacité bornée"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("La capacité du memo doit être positive")
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Résultat en cache pour une clé (le texte, ou (langue, texte))"""
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Hashable, result: Any) -> Any:
+        """Enregistre le résultat (figé) et le retourne"""
+        frozen = freeze(result)
+        self._entries[key] = frozen
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return frozen
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio, 4),
+            'size': len(self._entries),
+            'capacity': self.capacity
+        }
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Banque de patterns dhātu pré-compilée pour PaniniFS
+Fusionne tous les patterns (dhātu et gaps) en un seul scanner regex
+parcourant chaque texte une seule fois de gauche à droite
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from dhatu_keyword_engine import CASE_FOLDING_AVAILABLE, KeywordMatcher, extract_literal_vocabulary
+
+try:
+    from re import _parser as sre_parse  # Python >= 3.11
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+@dataclass(frozen=True)
+class BankPattern:
+    """Pattern individuel enregistré dans la banque"""
+    index: int
+    kind: str  # 'dhatu', 'gap', ...
+    category: str  # nom du dhātu ou du gap
+    source: str  # pattern regex d'origine
+
+# Détection : (index du pattern, début, fin)
+BankHit = Tuple[int, int, int]
+
+# Moteurs de scan : 'keywords' (Aho-Corasick pour les patterns littéraux,
+# regex pour le reste) ou 'regex' (alternation compilée pour tout)
+ENGINES = ('keywords', 'regex')
+
+class PatternBank:
+    """Scanner unique regroupant plusieurs familles de patterns.
+
+    Chaque pattern est placé dans un lookahead nommé, si bien qu'une seule
+    passe ``finditer`` suffit pour connaître, à chaque position, tous les
+    patterns qui y commencent. Un filtre par pattern (début >= fin de la
+    détection précédente) reproduit exactement la sémantique de
+    ``re.finditer(pattern, text, flags)`` appelé pattern par pattern.
+    Les patterns ne doivent pas accepter la chaîne vide.
+
+    Avec le moteur 'keywords', les patterns littéraux (\\b(mot|mot)\\b) sont
+    confiés à un automate Aho-Corasick, linéaire en la longueur du texte
+    quelle que soit la taille du vocabulaire ; les autres restent en regex.
+    Sans CASE_FOLDING_AVAILABLE, une banque IGNORECASE reste toute en regex.
+
+    Si match_cache (voir dhatu_match_cache) est renseigné, scan consulte
+    d'abord le cache, indexé par le texte et l'empreinte de la banque.
+    Si profiler (voir dhatu_profiler) est renseigné, scan lui délègue le
+    scan, pattern par pattern et chronométré, sans passer par le cache.
+
+    Une banque partagée (voir dhatu_pattern_registry) est figée : ses
+    options ne changent pas, derive() en donne une copie légère qui
+    partage les scanners compilés. origin, s'il est renseigné, est un
+    couple (fonction, arguments) qui retrouve la banque : elle est alors
+    sérialisée par référence, sans ses scanners.
+    """
+
+    def __init__(self, groups: Dict[str, Dict[str, List[str]]], flags: int = re.IGNORECASE,
+                 engine: str = 'keywords'):
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur inconnu : {engine} (attendu : {', '.join(ENGINES)})")
+        # groups : {kind: {category: [pattern, ...]}}, ordre des dicts conservé
+        patterns = []
+        for kind, categories in groups.items():
+            for category, sources in categories.items():
+                for source in sources:
+                    patterns.append(BankPattern(len(patterns), kind, category, source))
+        self.patterns: Tuple[BankPattern, ...] = tuple(patterns)
+        self.flags = flags
+        self.match_cache = None
+        self.profiler = None
+        self.origin = None
+        self._frozen = False
+        self.fingerprint = self._fingerprint(self.patterns, flags)
+        
+        literal = {}
+        case_folding = CASE_FOLDING_AVAILABLE or not flags & re.IGNORECASE
+        if engine != 'regex' and case_folding and not flags & ~(re.IGNORECASE | re.UNICODE):
+            for pattern in self.patterns:
+                vocabulary = extract_literal_vocabulary(pattern.source)
+                if vocabulary is not None:
+                    literal[pattern.index] = vocabulary
+        self.engine = 'keywords' if literal else 'regex'
+        self._keywords = KeywordMatcher(literal, ignore_case=bool(flags & re.IGNORECASE)) if literal else None
+        
+        regex_patterns = tuple(p for p in self.patterns if p.index not in literal)
+        self._regex_indices = tuple(p.index for p in regex_patterns)
+        self._scanner, self._group_numbers = self._compile(regex_patterns, flags)
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen'):
+            raise AttributeError(f"Banque partagée figée ({name}) : utiliser derive()")
+        object.__setattr__(self, name, value)
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> 'PatternBank':
+        """Fige la banque (partage entre analyseurs) et la retourne"""
+        self._frozen = True
+        return self
+
+    def derive(self, match_cache=None) -> 'PatternBank':
+        """Copie non figée, avec ses propres options, partageant les scanners compilés"""
+        bank = object.__new__(PatternBank)
+        bank.__dict__.update(self.__dict__, _frozen=False)
+        bank.match_cache = match_cache
+        bank.profiler = None
+        return bank
+
+    def __reduce_ex__(self, protocol):
+        if self.origin is None:
+            return super().__reduce_ex__(protocol)
+        if self._frozen:
+            return self.origin
+        return (_rebuild_derived, (self.origin, self.match_cache, self.profiler is not None))
+
+    @staticmethod
+    def _fingerprint(patterns: Tuple[BankPattern, ...], flags: int) -> str:
+        """Empreinte des patterns et des flags (les deux moteurs donnent les mêmes détections)"""
+        digest = hashlib.sha256(str(flags).encode())
+        for pattern in patterns:
+            digest.update('\0'.join((pattern.kind, pattern.category, pattern.source, '')).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _compile(patterns: Tuple[BankPattern, ...], flags: int):
+        """Compile le scanner fusionné et retourne les numéros de groupe par pattern"""
+        if not patterns:
+            return None, ()
+        # Le lookahead de garde saute en C les positions sans aucune détection
+        gate = '|'.join(f'(?:{p.source})' for p in patterns)
+        probes = ''.join(f'(?:(?=(?P<_p{p.index}>{p.source})))?' for p in patterns)
+        # Pré-filtre sur le premier caractère possible : évite d'essayer
+        # toute l'alternation sur les espaces, la ponctuation, etc.
+        first_chars = _first_char_class([p.source for p in patterns], flags)
+        prefilter = f'(?={first_chars})' if first_chars else ''
+        scanner = re.compile(f'{prefilter}(?=(?:{gate})){probes}', flags)
+        group_numbers = tuple(scanner.groupindex[f'_p{p.index}'] for p in patterns)
+        return scanner, group_numbers
+
+    def scan(self, text: str) -> List[BankHit]:
+        """Retourne toutes les détections triées par (début, index de pattern)"""
+        if self.profiler is not None:
+            return self.profiler.scan(text)
+        cache = self.match_cache
+        if cache is None:
+            return self._scan(text)
+        hits = cache.get(text, self.fingerprint)
+        if hits is None:
+            hits = self._scan(text)
+            cache.put(text, self.fingerprint, hits)
+        return hits
+
+    def _scan(self, text: str) -> List[BankHit]:
+        hits = self._scan_regex(text) if self._scanner is not None else []
+        if self._keywords is not None:
+            hits.extend(self._keywords.scan(text))
+            hits.sort(key=lambda hit: (hit[1], hit[0]))
+        return hits
+
+    def _scan_regex(self, text: str) -> List[BankHit]:
+        """Passe regex unique sur les patterns non confiés à l'automate"""
+        hits = []
+        regex_indices = self._regex_indices
+        last_end = [0] * len(regex_indices)
+        group_numbers = self._group_numbers
+        for match in self._scanner.finditer(text):
+            regs = match.regs
+            for position, group in enumerate(group_numbers):
+                start, end = regs[group]
+                # Non-chevauchement par pattern, comme re.finditer
+                if start >= 0 and start >= last_end[position]:
+                    hits.append((regex_indices[position], start, end))
+                    last_end[position] = end
+        return hits
+
+    def kind_hits(self, hits: List[BankHit], kind: str) -> List[BankHit]:
+        """Filtre les détections d'une famille donnée ('dhatu', 'gap', ...)"""
+        patterns = self.patterns
+        return [hit for hit in hits if patterns[hit[0]].kind == kind]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+def _rebuild_derived(origin, match_cache, profiled: bool) -> PatternBank:
+    """Reconstruit une banque dérivée d'une banque partagée (profil remis à zéro)"""
+    function, args = origin
+    bank = function(*args).derive(match_cache)
+    if profiled:
+        from dhatu_profiler import PatternProfiler  # dhatu_profiler importe ce module
+        bank.profiler = PatternProfiler(bank)
+    return bank
+
+def _first_chars(subpattern) -> Optional[Set[str]]:
+    """Ensemble des premiers caractères possibles d'un pattern parsé (None si inconnu)"""
+    for op, av in subpattern:
+        if op is sre_parse.AT:
+            continue  # assertion de largeur nulle (\b, ^, ...)
+        if op is sre_parse.LITERAL:
+            return {chr(av)}
+        if op is sre_parse.IN:
+            chars = set()
+            for item_op, item_av in av:
+                if item_op is sre_parse.LITERAL:
+                    chars.add(chr(item_av))
+                elif item_op is sre_parse.RANGE and item_av[1] - item_av[0] < 256:
+                    chars.update(chr(c) for c in range(item_av[0], item_av[1] + 1))
+                else:
+                    return None
+            return chars
+        if op is sre_parse.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op is sre_parse.BRANCH:
+            chars = set()
+            for branch in av[1]:
+                branch_chars = _first_chars(branch)
+                if branch_chars is None:
+                    return None
+                chars |= branch_chars
+            return chars
+        if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            return _first_chars(av[2])
+        return None
+    return None
+
+def _first_char_class(sources: List[str], flags: int) -> Optional[str]:
+    """Classe de caractères couvrant le début de tous les patterns, ou None"""
+    chars = set()
+    for source in sources:
+        source_chars = _first_chars(sre_parse.parse(source, flags))
+        if source_chars is None:
+            return None
+        chars |= source_chars
+    # Compilée avec les mêmes flags, la classe suit les mêmes règles de casse
+    return '[' + ''.join(re.escape(c) for c in sorted(chars)) + ']'
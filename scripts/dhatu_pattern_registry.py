@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Registre des banques de patterns dhātu, partagé par tout le processus
+Les patterns des analyseurs vivent dans des fichiers de données versionnés
+à côté de inventory_v0_1.json (experiments/dhatu/patterns_v0_1.json).
+Chaque jeu est lu une fois, figé (FrozenDict / tuple), et sa banque est
+compilée au premier usage puis partagée : construire un analyseur ne coûte
+plus rien. Jeux et banques se sérialisent par référence (nom + fichier),
+si bien que les workers d'un pool les rechargent depuis leur propre
+registre au lieu de recevoir les scanners compilés.
+
+Format : {"version": "0.1", "sets": {nom: {type: {catégorie: info}}}}
+où info est une liste de patterns ou un dict avec une clé "patterns" ;
+"extends": "autre_nom" reprend les catégories d'un autre jeu du fichier.
+"""
+
+import json
+import os
+import threading
+from collections.abc import Mapping
+from typing import Dict, List, Tuple
+from dhatu_memo import freeze
+from dhatu_pattern_bank import PatternBank
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PATTERNS_FILE = os.path.join(HERE, '..', 'experiments', 'dhatu', 'patterns_v0_1.json')
+SUPPORTED_VERSIONS = ('0.1',)
+
+_lock = threading.RLock()
+_files: Dict[str, Tuple[int, Dict]] = {}  # chemin -> (mtime_ns, contenu)
+_sets: Dict[Tuple[str, str], 'PatternSet'] = {}  # (chemin, nom) -> jeu partagé
+
+class PatternSet:
+    """Jeu de patterns figé, avec sa banque compilée partagée"""
+
+    def __init__(self, name: str, path: str, version: str, groups: Dict[str, Dict]):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.groups = freeze(groups)  # {type: {catégorie: info}}
+        self._bank = None
+
+    def __reduce__(self):
+        return (get_pattern_set, (self.name, self.path))
+
+    def __repr__(self) -> str:
+        return f"PatternSet({self.name!r}, version={self.version!r})"
+
+    @property
+    def dhatu(self) -> Mapping:
+        return self.groups.get('dhatu', freeze({}))
+
+    @property
+    def gap(self) -> Mapping:
+        return self.groups.get('gap', freeze({}))
+
+    @property
+    def bank(self) -> PatternBank:
+        """Banque compilée au premier accès, figée et partagée"""
+        if self._bank is None:
+            with _lock:
+                if self._bank is None:
+                    bank = PatternBank({kind: {category: _sources(info) for category, info in categories.items()}
+                                        for kind, categories in self.groups.items()})
+                    bank.origin = (shared_bank, (self.name, self.path))
+                    self._bank = bank.freeze()
+        return self._bank
+
+    @property
+    def fingerprint(self) -> str:
+        return self.bank.fingerprint
+
+def _sources(info) -> List[str]:
+    return info['patterns'] if isinstance(info, Mapping) else info
+
+def _load_file(path: str) -> Dict:
+    """Contenu du fichier de patterns, relu seulement si sa date a changé"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _files.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Version de patterns non supportée: {data.get('version')} ({path})")
+    _files[path] = (mtime, data)
+    # Les jeux déjà distribués restent valides ; les suivants suivront le fichier
+    for key in [key for key in _sets if key[0] == path]:
+        del _sets[key]
+    return data
+
+def _resolve_groups(sets: Dict, name: str, seen: Tuple[str, ...] = ()) -> Dict[str, Dict]:
+    if name not in sets:
+        raise KeyError(f"Jeu de patterns inconnu: {name}")
+    if name in seen:
+        raise ValueError(f"Héritage circulaire des jeux de patterns: {' -> '.join(seen + (name,))}")
+    definition = sets[name]
+    groups = {}
+    if 'extends' in definition:
+        groups = _resolve_groups(sets, definition['extends'], seen + (name,))
+    for kind, categories in definition.items():
+        if kind == 'extends':
+            continue
+        groups[kind] = {**groups.get(kind, {}), **categories}
+    return groups
+
+def get_pattern_set(name: str, path: str = None) -> PatternSet:
+    """Jeu de patterns partagé (chargé une fois par processus)"""
+    path = os.path.abspath(path or PATTERNS_FILE)
+    with _lock:
+        data = _load_file(path)
+        pattern_set = _sets.get((path, name))
+        if pattern_set is None:
+            pattern_set = PatternSet(name, path, data['version'], _resolve_groups(data['sets'], name))
+            _sets[(path, name)] = pattern_set
+        return pattern_set
+
+def shared_bank(name: str, path: str = None) -> PatternBank:
+    """Banque compilée partagée d'un jeu de patterns"""
+    return get_pattern_set(name, path).bank
+
+def list_pattern_sets(path: str = None) -> List[str]:
+    with _lock:
+        return list(_load_file(os.path.abspath(path or PATTERNS_FILE))['sets'])
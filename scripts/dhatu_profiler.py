@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Profilage par pattern des banques dhātu
+La banque fusionne tous les patterns en une passe : impossible d'y
+attribuer le temps à un pattern. En mode profilage, chaque pattern est
+exécuté seul (re.finditer, mêmes détections que la banque) et chronométré ;
+on accumule par pattern le temps de scan, le nombre d'appels, de détections
+et la longueur détectée, pour repérer les patterns coûteux (backtracking de
+\\[.*\\], do.*while...) et les patterns morts.
+"""
+
+import json
+import re
+import time
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Sequence, Tuple
+from dhatu_pattern_bank import BankHit, PatternBank
+
+# Compteurs d'un pattern : (secondes, appels, détections, caractères détectés)
+PatternCounters = Tuple[float, int, int, int]
+
+@dataclass
+class PatternProfile:
+    """Statistiques cumulées d'un pattern"""
+    index: int
+    kind: str
+    category: str
+    source: str
+    seconds: float
+    calls: int
+    matches: int
+    matched_chars: int
+
+    @property
+    def avg_match_length(self) -> float:
+        return self.matched_chars / self.matches if self.matches else 0.0
+
+    @property
+    def avg_call_us(self) -> float:
+        return self.seconds / self.calls * 1e6 if self.calls else 0.0
+
+class PatternProfiler:
+    """Scan pattern par pattern avec compteurs, en remplacement de PatternBank.scan"""
+
+    def __init__(self, bank: PatternBank):
+        self.bank = bank
+        self._regexes = tuple(re.compile(p.source, bank.flags) for p in bank.patterns)
+        count = len(bank.patterns)
+        self._seconds = array('d', bytes(8 * count))
+        self._calls = array('q', bytes(8 * count))
+        self._matches = array('q', bytes(8 * count))
+        self._matched_chars = array('q', bytes(8 * count))
+
+    def scan(self, text: str) -> List[BankHit]:
+        """Détections triées par (début, index de pattern), comme PatternBank.scan"""
+        hits = []
+        clock = time.perf_counter
+        seconds, calls = self._seconds, self._calls
+        matches, matched_chars = self._matches, self._matched_chars
+        for index, regex in enumerate(self._regexes):
+            start = clock()
+            spans = [match.span() for match in regex.finditer(text)]
+            seconds[index] += clock() - start
+            calls[index] += 1
+            matches[index] += len(spans)
+            for begin, end in spans:
+                matched_chars[index] += end - begin
+                hits.append((index, begin, end))
+        hits.sort(key=lambda hit: (hit[1], hit[0]))
+        return hits
+
+    def snapshot(self) -> List[PatternCounters]:
+        """Compteurs courants, pattern par pattern"""
+        return list(zip(self._seconds, self._calls, self._matches, self._matched_chars))
+
+    def add(self, counters: Sequence[PatternCounters]):
+        """Ajoute des compteurs (par exemple ceux d'un processus worker)"""
+        for index, (seconds, calls, matches, chars) in enumerate(counters):
+            self._seconds[index] += seconds
+            self._calls[index] += calls
+            self._matches[index] += matches
+            self._matched_chars[index] += chars
+
+    def reset(self):
+        for column in (self._seconds, self._calls, self._matches, self._matched_chars):
+            for index in range(len(column)):
+                column[index] = 0
+
+    def profiles(self) -> List[PatternProfile]:
+        """Profils classés par temps cumulé décroissant"""
+        profiles = [PatternProfile(p.index, p.kind, p.category, p.source, *counters)
+                    for p, counters in zip(self.bank.patterns, self.snapshot())]
+        profiles.sort(key=lambda profile: (-profile.seconds, profile.index))
+        return profiles
+
+    def dead_patterns(self) -> List[PatternProfile]:
+        """Patterns appelés mais jamais détectés"""
+        return [profile for profile in self.profiles() if profile.calls and not profile.matches]
+
+    def to_dict(self) -> Dict:
+        total = sum(self._seconds)
+        patterns = []
+        for profile in self.profiles():
+            entry = asdict(profile)
+            entry['seconds'] = round(profile.seconds, 6)
+            entry['share'] = round(profile.seconds / total, 4) if total else 0.0
+            entry['avg_call_us'] = round(profile.avg_call_us, 3)
+            entry['avg_match_length'] = round(profile.avg_match_length, 2)
+            patterns.append(entry)
+        return {
+            'fingerprint': self.bank.fingerprint,
+            'total_seconds': round(total, 6),
+            'texts': max(self._calls, default=0),
+            'patterns': patterns
+        }
+
+    def export_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def report(self, top: int = 10) -> str:
+        """Rapport texte : patterns les plus coûteux puis patterns morts"""
+        total = sum(self._seconds)
+        lines = [f"⏱️  Profil des patterns ({max(self._calls, default=0)} textes, {total * 1000:.1f} ms de scan)"]
+        for rank, profile in enumerate(self.profiles()[:top], 1):
+            share = profile.seconds / total if total else 0.0
+            label = f"{profile.kind}:{profile.category}"
+            lines.append(f"   {rank:2}. {label:<18} {share:6.1%} "
+                         f"{profile.avg_call_us:8.2f} µs/appel, {profile.matches} détections "
+                         f"(long. moy. {profile.avg_match_length:.1f}) {profile.source[:60]}")
+        dead = self.dead_patterns()
+        if dead:
+            lines.append(f"💤 Patterns sans détection: {len(dead)}")
+            for profile in dead:
+                lines.append(f"   - {profile.kind}:{profile.category} {profile.source[:60]}")
+        return '\n'.join(lines)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Enregistrements compacts pour les détections des analyseurs
+Un record ne stocke que des références partagées (texte, table de
+libellés ou banque) et des offsets dans des __slots__ ; les champs publics
+(fragment, contexte, concept...) sont des propriétés calculées à la lecture.
+from_fields construit un record depuis ses champs publics, comme les
+anciens constructeurs dataclass.
+"""
+
+from typing import Any, Dict, Tuple
+
+class SlotRecord:
+    """Base des records à __slots__ : égalité, repr et export par champs publics"""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    _record_class: type = None  # classe publique (commune aux records construits par champs)
+    _field_class: type = None
+
+    def __init_subclass__(cls, field_values: bool = False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if field_values:
+            return
+        cls._record_class = cls
+        # Variante qui stocke les valeurs des champs telles quelles
+        namespace = {'__slots__': ('_values',), '__doc__': cls.__doc__, '__module__': cls.__module__,
+                     '__qualname__': f"{cls.__qualname__}._field_class"}  # pickle par ce chemin
+        for position, name in enumerate(cls._fields):
+            namespace[name] = property(lambda self, position=position: self._values[position])
+        cls._field_class = type(cls.__name__, (cls,), namespace, field_values=True)
+
+    @classmethod
+    def from_fields(cls, *args, **kwargs) -> 'SlotRecord':
+        """Record construit depuis ses champs publics (dans l'ordre de _fields)"""
+        if len(args) > len(cls._fields):
+            raise TypeError(f"{cls.__name__}.from_fields() prend au plus {len(cls._fields)} champs")
+        values = dict(zip(cls._fields, args))
+        for name, value in kwargs.items():
+            if name not in cls._fields or name in values:
+                raise TypeError(f"{cls.__name__}.from_fields(): champ inattendu ou répété {name!r}")
+            values[name] = value
+        missing = [name for name in cls._fields if name not in values]
+        if missing:
+            raise TypeError(f"{cls.__name__}.from_fields(): champs manquants {', '.join(missing)}")
+        record = object.__new__(cls._field_class)
+        record._values = tuple(values[name] for name in cls._fields)
+        return record
+
+    def _astuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def asdict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SlotRecord) or other._record_class is not self._record_class:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self) -> int:
+        return hash(self._astuple())
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{self._record_class.__name__}({fields})"
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Segmentation des écritures sans espaces (mandarin, japonais)
+Pour ces langues, \\b\\w+\\b prend une phrase entière pour un seul "mot" :
+les runs de sinogrammes et de kana sont découpés par maximum matching
+(plus long mot du lexique d'abord) sur un trie construit depuis
+experiments/dhatu/lexicons/<lang>.txt. Le coût est linéaire en la longueur
+du texte (chaque position explore au plus la longueur du plus long mot).
+"""
+
+import hashlib
+import os
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from dhatu_tokenizer import WORD_PATTERN, TokenStream, tokenize
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LEXICON_DIR = os.path.join(HERE, '..', 'experiments', 'dhatu', 'lexicons')
+
+_KANA = '぀-ヿㇰ-ㇿｦ-ﾟ'
+_HAN = '々㐀-䶿一-鿿豈-﫿\U00020000-\U0002ffff'
+UNSPACED_PATTERN = re.compile(f'[{_KANA}{_HAN}]+')
+_KANA_PATTERN = re.compile(f'[{_KANA}]')
+_KATAKANA_PATTERN = re.compile('[゠-ヿㇰ-ㇿｦ-ﾟ]+')
+_HIRAGANA_PATTERN = re.compile('[぀-ゟ]')
+
+# Longueur minimale (exclusive) d'un mot non couvert pour compter comme gap
+MIN_GAP_LENGTH = 3
+
+SEGMENTER_VERSION = 1  # à incrémenter si l'algorithme de découpage change
+
+_END = ''  # clé de fin de mot dans les nœuds du trie (aucun caractère n'est vide)
+
+class LexiconTrie:
+    """Trie de caractères ; match le plus long en O(longueur du plus long mot)"""
+
+    def __init__(self, words: Iterable[str]):
+        self.root: Dict[str, dict] = {}
+        self.max_length = 0
+        for word in words:
+            node = self.root
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[_END] = True
+            self.max_length = max(self.max_length, len(word))
+
+    def longest_match(self, text: str, start: int, end: int) -> int:
+        """Longueur du plus long mot du lexique commençant en start (0 si aucun)"""
+        node = self.root
+        best = 0
+        for i in range(start, min(end, start + self.max_length)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if _END in node:
+                best = i + 1 - start
+        return best
+
+class MaxMatchSegmenter:
+    """Segmenteur par maximum matching vers l'avant"""
+
+    def __init__(self, words: Iterable[str]):
+        self.trie = LexiconTrie(words)
+
+    def segment_run(self, text: str, start: int, end: int, offsets: array):
+        """Ajoute les (début, fin) des mots du run [start, end) à offsets"""
+        i = start
+        while i < end:
+            length = self.trie.longest_match(text, i, end)
+            if not length:
+                # Mot inconnu : un run de katakana (emprunt) reste groupé, sinon un caractère
+                katakana = _KATAKANA_PATTERN.match(text, i, end)
+                length = katakana.end() - i if katakana else 1
+            offsets.append(i)
+            offsets.append(i + length)
+            i += length
+
+    def tokenize(self, text: str) -> TokenStream:
+        """Tokens \\b\\w+\\b, dont les runs sans espaces sont segmentés"""
+        offsets = array('l')
+        for word in WORD_PATTERN.finditer(text):
+            position, word_end = word.span()
+            for run in UNSPACED_PATTERN.finditer(text, position, word_end):
+                if run.start() > position:
+                    offsets.extend((position, run.start()))
+                self.segment_run(text, run.start(), run.end(), offsets)
+                position = run.end()
+            if position < word_end:
+                offsets.extend((position, word_end))
+        return TokenStream(text, offsets)
+
+def is_gap_word(text: str, start: int, end: int) -> bool:
+    """Un mot non couvert [start, end) compte-t-il comme gap sémantique ?
+
+    Écritures alphabétiques : plus de MIN_GAP_LENGTH caractères. Les mots
+    segmentés en sinogrammes/kana font 1 à 3 caractères : ils comptent tous,
+    sauf un kana hiragana isolé (particule : は, が, に...).
+    """
+    if UNSPACED_PATTERN.fullmatch(text, start, end):
+        return end - start > 1 or not _HIRAGANA_PATTERN.match(text, start)
+    return end - start > MIN_GAP_LENGTH
+
+def load_lexicon(path: str) -> List[str]:
+    """Mots d'un fichier lexique (un par ligne, # pour les commentaires)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+@lru_cache(maxsize=None)
+def get_segmenter(lang: str) -> Optional[MaxMatchSegmenter]:
+    """Segmenteur d'une langue (mis en cache), None sans lexique"""
+    path = os.path.join(LEXICON_DIR, f"{lang}.txt")
+    if not os.path.exists(path):
+        return None
+    return MaxMatchSegmenter(load_lexicon(path))
+
+def segmenter_fingerprint() -> str:
+    """Identité de la segmentation : version de l'algorithme + contenu des lexiques
+
+    Les corpus pré-tokenisés la mémorisent pour détecter des tokens périmés.
+    """
+    digest = hashlib.sha256(f"maxmatch-{SEGMENTER_VERSION}".encode('utf-8'))
+    if os.path.isdir(LEXICON_DIR):
+        for name in sorted(os.listdir(LEXICON_DIR)):
+            if name.endswith('.txt'):
+                digest.update(b'\0' + name.encode('utf-8') + b'\0')
+                with open(os.path.join(LEXICON_DIR, name), 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def detect_unspaced_language(text: str) -> Optional[str]:
+    """Langue de segmentation déduite de l'écriture : kana -> jpn, sinogrammes -> cmn"""
+    if not UNSPACED_PATTERN.search(text):
+        return None
+    return 'jpn' if _KANA_PATTERN.search(text) else 'cmn'
+
+def tokenize_for_language(text: str, lang: str = None) -> TokenStream:
+    """Tokenisation adaptée à l'écriture
+
+    lang : code de langue (prompts_child) ; sans lexique pour cette langue,
+    ou si lang est absent, l'écriture du texte choisit le segmenteur. Les
+    textes sans sinogrammes ni kana suivent la tokenisation \\b\\w+\\b.
+    """
+    if not UNSPACED_PATTERN.search(text):
+        return tokenize(text)
+    segmenter = get_segmenter(lang) if lang else None
+    if segmenter is None:
+        detected = detect_unspaced_language(text)
+        segmenter = get_segmenter(detected) if detected else None
+    if segmenter is None:
+        return tokenize(text)
+    return segmenter.tokenize(text)
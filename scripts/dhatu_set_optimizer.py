@@ -4,14 +4,30 @@ Optimiseur de Set Minimal de Dhātu pour PaniniFS
 Recherche le nombre optimal de dhātu pour couverture sémantique maximale
 """
 
+import argparse
 import json
+import dataclasses
+import hashlib
+import heapq
 import itertools
-from typing import Dict, List, Set, Tuple
+import math
+import operator
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from semantic_coverage_analyzer import SemanticCoverageAnalyzer
+from dhatu_pattern_registry import get_pattern_set
+from corpus_reader import iter_chunks, iter_texts
+from tokenized_corpus import TokenizedCorpus, is_tokenized_corpus
 from dhatu_candidate_generator import DhatuCandidateGenerator, DhatuCandidate
 
+# Matrices d'incidence gardées par optimiseur (LRU)
+INCIDENCE_CACHE_SIZE = 8
+
 @dataclass
 class OptimizationResult:
     """Résultat d'une optimisation de set dhātu"""
@@ -21,6 +37,206 @@ class OptimizationResult:
     semantic_completeness: float  # % concepts sémantiques couverts
     redundancy_score: float  # Niveau de redondance entre dhātu
 
+@dataclass
+class SizeStatistics:
+    """Statistiques courantes des sets d'une taille donnée"""
+    count: int = 0
+    coverage_sum: float = 0.0
+    best: Optional[OptimizationResult] = None  # meilleure couverture (premier en cas d'égalité)
+    
+    @property
+    def mean_coverage(self) -> float:
+        return self.coverage_sum / self.count if self.count else 0
+
+class ResultCollector:
+    """Collecteur en flux des résultats d'optimisation, à mémoire constante
+
+    Par taille de set, ne conserve que des statistiques courantes (nombre,
+    somme des couvertures, meilleur résultat) et un tas des top_k sets.
+    Le détail de chaque résultat peut être écrit au fil de l'eau en JSONL.
+    """
+    
+    def __init__(self, top_k: int = 10, dump_path: str = None):
+        self.top_k = top_k
+        self.stats: Dict[int, SizeStatistics] = {}
+        self._heaps: Dict[int, list] = defaultdict(list)
+        self._sequence = itertools.count()
+        self._dump = open(dump_path, 'w', encoding='utf-8') if dump_path else None
+    
+    def add(self, result: OptimizationResult):
+        size = len(result.dhatu_set)
+        stats = self.stats.setdefault(size, SizeStatistics())
+        stats.count += 1
+        stats.coverage_sum += result.coverage_score
+        if stats.best is None or result.coverage_score > stats.best.coverage_score:
+            stats.best = result
+        
+        # À couverture égale, le résultat le plus ancien reste devant
+        entry = (result.coverage_score, -next(self._sequence), result)
+        heap = self._heaps[size]
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+        
+        if self._dump is not None:
+            self._dump.write(json.dumps(dataclasses.asdict(result), ensure_ascii=False) + '\n')
+    
+    def top(self, size: int) -> List[OptimizationResult]:
+        """Top-k des sets d'une taille, par couverture décroissante"""
+        return [entry[2] for entry in sorted(self._heaps[size], key=lambda entry: entry[:2], reverse=True)]
+    
+    def results_by_size(self) -> Dict[int, List[OptimizationResult]]:
+        return {size: self.top(size) for size in self.stats}
+    
+    def close(self):
+        if self._dump is not None:
+            self._dump.close()
+            self._dump = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+@dataclass
+class CorpusIncidence:
+    """Matrice textes × dhātu précalculée sur un corpus de test
+
+    Les détections d'un dhātu ne dépendent pas des autres dhātu du set :
+    le corpus est scanné une seule fois et tout sous-ensemble est ensuite
+    évalué par simple arithmétique sur les colonnes.
+
+    Les textes de même signature (détections par dhātu, gaps) sont fusionnés
+    en une ligne pondérée : la taille de la matrice dépend du nombre de
+    signatures distinctes, pas de la taille du corpus.
+    """
+    dhatu_names: Tuple[str, ...]
+    columns: Dict[str, array]  # détections par signature, pour chaque dhātu
+    gap_totals: array  # gaps par signature (indépendants du set)
+    gap_categories: Set[str]  # catégories de gaps présentes dans le corpus
+    text_count: int
+    weights: array = dataclasses.field(default_factory=lambda: array('l'))  # textes par signature
+    # Chevauchements réels sur le corpus : overlaps[i][j] = paires (match de i,
+    # match de j) dont les spans se recouvrent ; match_totals[i] = matches de i
+    overlaps: List[List[int]] = dataclasses.field(default_factory=list)
+    match_totals: List[int] = dataclasses.field(default_factory=list)
+    
+    @property
+    def dhatu_index(self) -> Dict[str, int]:
+        return {name: i for i, name in enumerate(self.dhatu_names)}
+    
+    @property
+    def row_count(self) -> int:
+        return len(self.gap_totals)
+
+def _texts_digest(texts: Sequence[str]) -> str:
+    """Empreinte du contenu d'une liste de textes (chaque texte préfixé de sa longueur)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for text in texts:
+        data = text.encode('utf-8', 'surrogatepass')
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    return digest.hexdigest()
+
+def _corpus_cache_key(test_corpus) -> Optional[Tuple]:
+    """Clé de cache d'un corpus : empreinte du contenu d'une liste, identité
+    d'un fichier ou d'un corpus pré-tokenisé, None pour un flux"""
+    if isinstance(test_corpus, TokenizedCorpus):
+        return test_corpus.cache_key
+    if isinstance(test_corpus, str):
+        if is_tokenized_corpus(test_corpus):
+            return TokenizedCorpus(test_corpus).cache_key
+        stat = os.stat(test_corpus)
+        return ('file', os.path.abspath(test_corpus), stat.st_mtime_ns, stat.st_size)
+    if isinstance(test_corpus, (list, tuple)):
+        return ('texts', len(test_corpus), _texts_digest(test_corpus))
+    return None
+
+def _overlap_matrix(batch, dhatu_count: int, overlaps: List[List[int]] = None) -> List[List[int]]:
+    """Compte, par paire de dhātu, les matches dont les spans se recouvrent
+
+    overlaps : matrice à compléter (cumul lot par lot), sinon une nouvelle.
+    """
+    if overlaps is None:
+        overlaps = [[0] * dhatu_count for _ in range(dhatu_count)]
+    # Matches groupés par texte (match_text est croissant), triés par début
+    by_text = defaultdict(list)
+    for text_index, dhatu, start, end in zip(batch.match_text, batch.match_dhatu,
+                                             batch.match_start, batch.match_end):
+        by_text[text_index].append((start, end, dhatu))
+    for matches in by_text.values():
+        matches.sort()
+        for a, (start_a, end_a, dhatu_a) in enumerate(matches):
+            for start_b, end_b, dhatu_b in matches[a + 1:]:
+                if start_b >= end_a:
+                    break
+                if dhatu_a != dhatu_b:
+                    overlaps[dhatu_a][dhatu_b] += 1
+                    overlaps[dhatu_b][dhatu_a] += 1
+    return overlaps
+
+# Matrice d'incidence partagée par les workers : (colonnes dhātu, gaps et poids par ligne)
+_shared_incidence = None
+
+def _attach_shared_incidence(name: str, dhatu_count: int, row_count: int):
+    """Initialiseur de worker : s'attache au bloc de mémoire partagée, sans copie"""
+    global _shared_incidence
+    block = shared_memory.SharedMemory(name=name)
+    view = block.buf.cast('i')
+    columns = [view[j * row_count:(j + 1) * row_count] for j in range(dhatu_count)]
+    gap_totals = view[dhatu_count * row_count:(dhatu_count + 1) * row_count]
+    weights = view[(dhatu_count + 1) * row_count:(dhatu_count + 2) * row_count]
+    # Garder une référence au bloc pour qu'il reste ouvert dans le worker
+    _shared_incidence = (block, columns, gap_totals, weights)
+
+def _unrank_combination(rank: int, n: int, k: int) -> List[int]:
+    """k-combinaison de range(n) de rang donné, dans l'ordre lexicographique"""
+    combination = []
+    start = 0
+    for remaining in range(k, 0, -1):
+        for i in range(start, n):
+            count = math.comb(n - i - 1, remaining - 1)
+            if rank < count:
+                combination.append(i)
+                start = i + 1
+                break
+            rank -= count
+    return combination
+
+def _next_combination(combination: List[int], n: int) -> bool:
+    """Passe à la combinaison suivante (ordre lexicographique), False à la fin"""
+    k = len(combination)
+    for i in range(k - 1, -1, -1):
+        if combination[i] < n - k + i:
+            combination[i] += 1
+            for j in range(i + 1, k):
+                combination[j] = combination[j - 1] + 1
+            return True
+    return False
+
+def _top_combinations(task: Tuple[int, int, int, int, int], columns: Sequence = None,
+                      gap_totals: Sequence = None, weights: Sequence = None) -> List[Tuple[float, Tuple[int, ...]]]:
+    """Évalue les combinaisons de rangs [début, fin) et garde les top_k"""
+    n, size, start_rank, end_rank, top_k = task
+    if columns is None:
+        _, columns, gap_totals, weights = _shared_incidence
+    heap = []
+    combination = _unrank_combination(start_rank, n, size)
+    for _ in range(start_rank, end_rank):
+        covered = map(sum, zip(*(columns[j] for j in combination))) if combination else [0] * len(gap_totals)
+        coverage = DhatuSetOptimizer._average_coverage(covered, gap_totals, weights)
+        # À couverture égale, la combinaison la plus petite en ordre lexical gagne
+        entry = (coverage, tuple(-j for j in combination))
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+        if not _next_combination(combination, n):
+            break
+    return [(coverage, tuple(-j for j in negated)) for coverage, negated in heap]
+
 class DhatuSetOptimizer:
     """Optimiseur pour trouver le set minimal de dhātu optimal"""
     
@@ -28,84 +244,51 @@ class DhatuSetOptimizer:
         self.analyzer = SemanticCoverageAnalyzer()
         self.generator = DhatuCandidateGenerator()
         
-        # Définition des nouveaux dhātu proposés avec leurs patterns
-        self.extended_dhatu_patterns = {
-            # Dhātu originaux
-            **self.analyzer.dhatu_patterns,
-            
-            # Nouveaux dhātu candidats
-            'EXIST': {
-                'patterns': [
-                    r'\b(exists?|there is|there are|being|reality|presence)\b',
-                    r'\b(existe|il y a|être|réalité|présence)\b',
-                    r'\b(available|present|absent|missing)\b'
-                ],
-                'concepts': ['existence', 'presence', 'being', 'availability']
-            },
-            'EVAL': {
-                'patterns': [
-                    r'\b(elegant|beautiful|ugly|good|bad|better|worse|quality)\b',
-                    r'\b(élégant|beau|laid|bon|mauvais|meilleur|pire|qualité)\b',
-                    r'\b(clean|robust|efficient|optimal|superior)\b'
-                ],
-                'concepts': ['evaluation', 'quality', 'assessment', 'aesthetics']
-            },
-            'CAUSE': {
-                'patterns': [
-                    r'\b(because|since|due to|causes?|results in|leads to)\b',
-                    r'\b(parce que|car|à cause de|provoque|entraîne|mène à)\b',
-                    r'\b(therefore|thus|consequently|hence)\b'
-                ],
-                'concepts': ['causation', 'consequence', 'reason', 'implication']
-            },
-            'MODAL': {
-                'patterns': [
-                    r'\b(might|could|may|possible|potential|maybe|perhaps)\b',
-                    r'\b(pourrait|peut-être|possible|potentiel|éventuellement)\b',
-                    r'\b(probably|likely|unlikely|chance)\b'
-                ],
-                'concepts': ['possibility', 'probability', 'modality', 'uncertainty']
-            },
-            'RELATE': {
-                'patterns': [
-                    r'\b(relates to|in relation to|connected to|linked to|associated)\b',
-                    r'\b(en relation avec|lié à|associé à|connecté à)\b',
-                    r'\b(compared to|versus|relative to|with respect to)\b'
-                ],
-                'concepts': ['relation', 'connection', 'association', 'comparison']
-            },
-            'FEEL': {
-                'patterns': [
-                    r'\b(love|hate|like|prefer|enjoy|appreciate|dislike)\b',
-                    r'\b(aime|déteste|préfère|apprécie|n\'aime pas)\b',
-                    r'\b(satisfying|frustrating|exciting|boring|pleasant)\b'
-                ],
-                'concepts': ['emotion', 'preference', 'feeling', 'sentiment']
-            },
-            'FLOW': {
-                'patterns': [
-                    r'\b(then|after|before|next|previous|timeline|sequence)\b',
-                    r'\b(puis|après|avant|suivant|précédent|chronologie)\b',
-                    r'\b(meanwhile|simultaneously|eventually|finally)\b'
-                ],
-                'concepts': ['temporal_flow', 'progression', 'chronology', 'timing']
-            }
-        }
+        # Dhātu originaux + nouveaux dhātu candidats (jeu partagé 'extended')
+        self.extended_dhatu_patterns = get_pattern_set('extended').dhatu
+        
+        # Matrices d'incidence déjà calculées, par (empreinte des patterns, corpus)
+        self._incidence_cache: 'OrderedDict[Tuple, CorpusIncidence]' = OrderedDict()
     
     def find_minimal_optimal_set(self, target_coverage: float = 90.0, 
                                 max_dhatu: int = 12, 
-                                test_corpus: List[str] = None) -> Dict:
-        """Trouve le set minimal de dhātu pour atteindre la couverture cible"""
+                                test_corpus: Iterable[str] = None,
+                                exact: bool = False,
+                                top_k: int = 10,
+                                dump_path: str = None) -> Dict:
+        """Trouve le set minimal de dhātu pour atteindre la couverture cible
+
+        exact=True remplace l'échantillonnage des combinaisons (plafonné à
+        1000/500 par taille) par une recherche exacte par séparation et
+        évaluation (voir _find_exact_minimal_set) ; les sets évalués y sont
+        les top_k exacts de chaque taille.
+
+        Les résultats passent par un ResultCollector : 'results_by_size' ne
+        contient que les top_k sets de chaque taille, et dump_path (JSONL)
+        permet de conserver le détail de toutes les combinaisons évaluées.
+
+        test_corpus peut être une liste, un flux de textes ou le chemin d'un
+        fichier de corpus (voir _corpus_incidence).
+        """
         
         if test_corpus is None:
             test_corpus = self._get_default_test_corpus()
+        # Le corpus (éventuellement un flux) n'est consommé qu'une fois
+        incidence = self._corpus_incidence(test_corpus)
         
+        with ResultCollector(top_k, dump_path) as collector:
+            if exact:
+                return self._find_exact_minimal_set(target_coverage, max_dhatu, incidence, collector)
+            return self._search_sampled_sets(target_coverage, max_dhatu, incidence, collector)
+    
+    def _search_sampled_sets(self, target_coverage: float, max_dhatu: int,
+                             incidence: CorpusIncidence, collector: ResultCollector) -> Dict:
+        """Recherche par combinaisons de taille croissante (plafonnées par taille)"""
         all_dhatu = list(self.extended_dhatu_patterns.keys())
         best_result = None
-        results_by_size = defaultdict(list)
         
         print(f"🔍 Recherche du set optimal (cible: {target_coverage}%, max: {max_dhatu} dhātu)")
-        print(f"📊 Corpus de test: {len(test_corpus)} textes")
+        print(f"📊 Corpus de test: {incidence.text_count} textes")
         print(f"🧬 Dhātu disponibles: {len(all_dhatu)} ({', '.join(all_dhatu)})")
         
         # Tester des sets de taille croissante
@@ -122,8 +305,8 @@ class DhatuSetOptimizer:
                     break
                 
                 # Tester cette combinaison
-                result = self._evaluate_dhatu_set(list(dhatu_combination), test_corpus)
-                results_by_size[size].append(result)
+                result = self._score_dhatu_set(list(dhatu_combination), incidence)
+                collector.add(result)
                 
                 # Vérifier si c'est le meilleur résultat jusqu'à présent
                 if (best_result is None or 
@@ -140,7 +323,7 @@ class DhatuSetOptimizer:
                     print(f"   {combinations_tested} combinaisons testées...")
             
             # Si on a atteint la cible avec cette taille, on peut s'arrêter
-            best_for_size = max(results_by_size[size], key=lambda x: x.coverage_score)
+            best_for_size = collector.stats[size].best
             print(f"   Meilleur pour {size} dhātu: {best_for_size.coverage_score:.1f}% "
                   f"(efficacité: {best_for_size.efficiency_ratio:.1f}%)")
             
@@ -150,41 +333,299 @@ class DhatuSetOptimizer:
         
         return {
             'optimal_result': best_result,
-            'results_by_size': dict(results_by_size),
-            'analysis': self._analyze_optimization_results(results_by_size, target_coverage),
+            'results_by_size': collector.results_by_size(),
+            'analysis': self._analyze_optimization_results(collector, target_coverage),
             'recommendations': self._generate_optimization_recommendations(best_result, target_coverage)
         }
     
-    def _evaluate_dhatu_set(self, dhatu_set: List[str], test_corpus: List[str]) -> OptimizationResult:
-        """Évalue un set specific de dhātu sur le corpus de test"""
+    def _find_exact_minimal_set(self, target_coverage: float, max_dhatu: int,
+                                incidence: CorpusIncidence, collector: ResultCollector) -> Dict:
+        """Recherche exacte du plus petit set atteignant la couverture cible
+
+        Pour chaque taille k croissante, on cherche le set de k dhātu de
+        couverture maximale par séparation et évaluation : la couverture d'un
+        texte est croissante en son nombre d'unités couvertes, donc compléter
+        un set partiel avec les (k - m) meilleures colonnes restantes de chaque
+        texte donne une borne supérieure admissible. Tout sous-arbre dont la
+        borne ne dépasse pas le meilleur set connu est élagué, jamais tronqué.
+        Les top_k meilleurs sets de chaque taille (collector.top_k) sont
+        gardés par la recherche et transmis au collecteur.
+        """
+        all_dhatu = list(self.extended_dhatu_patterns.keys())
+        columns = [incidence.columns[name] for name in all_dhatu]
+        gap_totals = incidence.gap_totals
         
-        # Créer un analyseur temporaire avec ce set de dhātu
-        temp_patterns = {k: v for k, v in self.extended_dhatu_patterns.items() if k in dhatu_set}
-        temp_analyzer = SemanticCoverageAnalyzer()
-        temp_analyzer.dhatu_patterns = temp_patterns
+        print(f"🔍 Recherche exacte du set minimal (cible: {target_coverage}%, max: {max_dhatu} dhātu)")
+        print(f"📊 Corpus de test: {incidence.text_count} textes")
         
-        total_coverage = []
-        semantic_concepts_covered = set()
-        semantic_concepts_total = set()
+        search_stats = {}
+        best_result = None
         
-        for text in test_corpus:
-            result = temp_analyzer.analyze_text(text)
-            total_coverage.append(result['coverage_score']['percentage'])
+        for size in range(1, min(max_dhatu, len(all_dhatu)) + 1):
+            ranked, stats = self._branch_and_bound(columns, gap_totals, size, incidence.weights,
+                                                   max(1, collector.top_k))
+            results = [self._score_dhatu_set([all_dhatu[i] for i in chosen], incidence) for chosen, _ in ranked]
+            for ranked_result in results:
+                collector.add(ranked_result)
+            result, best_coverage = results[0], ranked[0][1]
+            search_stats[size] = stats
+            print(f"   {size} dhātu: {best_coverage:.1f}% — {stats['leaves_evaluated']} sets évalués, "
+                  f"{stats['nodes_pruned']} sous-arbres élagués ({stats['total_sets']} sets possibles)")
             
-            # Compter les concepts sémantiques
-            for match in result['dhatu_matches']:
-                semantic_concepts_covered.add(match.concept)
+            if best_result is None or result.coverage_score > best_result.coverage_score:
+                best_result = result
+            if result.coverage_score >= target_coverage:
+                best_result = result
+                print(f"   ✅ Cible atteinte avec {size} dhātu (optimum prouvé)")
+                break
+        
+        return {
+            'optimal_result': best_result,
+            'results_by_size': collector.results_by_size(),
+            'analysis': self._analyze_optimization_results(collector, target_coverage, exact=True),
+            'recommendations': self._generate_optimization_recommendations(best_result, target_coverage),
+            'search_stats': search_stats
+        }
+    
+    @staticmethod
+    def _average_coverage(covered_units, gap_totals, weights=None) -> float:
+        """Couverture moyenne du corpus pour des unités couvertes données par ligne
+
+        weights : nombre de textes par ligne (une ligne par texte si absent)
+        """
+        coverage = list(map(SemanticCoverageAnalyzer._coverage_percentage, covered_units, gap_totals))
+        if weights is None:
+            return sum(coverage) / len(coverage) if coverage else 0
+        text_count = sum(weights)
+        return sum(map(operator.mul, coverage, weights)) / text_count if text_count else 0
+    
+    def _branch_and_bound(self, columns: List[array], gap_totals: array, size: int,
+                          weights: array = None, top_k: int = 1):
+        """Les top_k sets de `size` colonnes maximisant la couverture moyenne
+
+        Retourne ([(indices, couverture)] par couverture décroissante, stats) ;
+        à couverture égale, le premier set en ordre lexical passe devant.
+        """
+        n = len(columns)
+        text_count = len(gap_totals)
+        stats = {'nodes_expanded': 0, 'nodes_pruned': 0, 'leaves_evaluated': 0,
+                 'total_sets': math.comb(n, size)}
+        best = []  # tas des top_k : (couverture, -ordre d'évaluation, set)
+        sequence = itertools.count()
+        
+        def threshold() -> float:
+            # Un sous-arbre doit battre le k-ième set connu (ex æquo : le premier évalué reste)
+            return best[0][0] if len(best) >= top_k else -1.0
+        
+        def upper_bound(covered: List[int], start: int, remaining: int) -> float:
+            # Chaque texte reçoit ses `remaining` meilleures colonnes parmi [start, n)
+            bounded = list(covered)
+            if remaining:
+                for t in range(text_count):
+                    bounded[t] += sum(heapq.nlargest(remaining, (columns[j][t] for j in range(start, n))))
+            return self._average_coverage(bounded, gap_totals, weights)
+        
+        def explore(chosen: List[int], covered: List[int], start: int):
+            remaining = size - len(chosen)
+            if remaining == 0:
+                stats['leaves_evaluated'] += 1
+                coverage = self._average_coverage(covered, gap_totals, weights)
+                if coverage > threshold():
+                    entry = (coverage, -next(sequence), list(chosen))
+                    if len(best) < top_k:
+                        heapq.heappush(best, entry)
+                    else:
+                        heapq.heapreplace(best, entry)
+                return
+            for i in range(start, n - remaining + 1):
+                child = list(map(operator.add, covered, columns[i]))
+                stats['nodes_expanded'] += 1
+                if upper_bound(child, i + 1, remaining - 1) <= threshold():
+                    stats['nodes_pruned'] += 1
+                    continue
+                chosen.append(i)
+                explore(chosen, child, i + 1)
+                chosen.pop()
+        
+        explore([], [0] * text_count, 0)
+        ranked = sorted(best, key=lambda entry: entry[:2], reverse=True)
+        return [(chosen, coverage) for coverage, _, chosen in ranked], stats
+    
+    def evaluate_combinations_parallel(self, size: int, test_corpus: Iterable[str] = None,
+                                       jobs: int = None, top_k: int = 10,
+                                       tasks_per_job: int = 4) -> List[OptimizationResult]:
+        """Évalue toutes les combinaisons de `size` dhātu sur un pool de processus
+
+        La matrice d'incidence est placée une seule fois en mémoire partagée
+        (multiprocessing.shared_memory) ; chaque tâche ne transporte que des
+        rangs de combinaisons et renvoie son top_k local, fusionné ensuite.
+        Retourne les top_k sets par couverture décroissante.
+        """
+        if test_corpus is None:
+            test_corpus = self._get_default_test_corpus()
+        jobs = jobs or os.cpu_count() or 1
+        incidence = self._corpus_incidence(test_corpus)
+        all_dhatu = list(self.extended_dhatu_patterns.keys())
+        columns = [incidence.columns[name] for name in all_dhatu]
+        n = len(all_dhatu)
+        row_count = incidence.row_count
+        
+        total = math.comb(n, size)
+        task_count = max(1, min(total, jobs * tasks_per_job))
+        bounds = [total * t // task_count for t in range(task_count + 1)]
+        tasks = [(n, size, bounds[t], bounds[t + 1], top_k) for t in range(task_count)
+                 if bounds[t] < bounds[t + 1]]
+        
+        if jobs > 1 and len(tasks) > 1:
+            packed = array('i', itertools.chain(*columns, incidence.gap_totals, incidence.weights))
+            block = shared_memory.SharedMemory(create=True, size=max(1, packed.itemsize * len(packed)))
+            try:
+                block.buf[:packed.itemsize * len(packed)] = packed.tobytes()
+                with ProcessPoolExecutor(max_workers=jobs, initializer=_attach_shared_incidence,
+                                         initargs=(block.name, n, row_count)) as pool:
+                    partials = list(pool.map(_top_combinations, tasks))
+            finally:
+                block.close()
+                block.unlink()
+        else:
+            partials = [_top_combinations(task, columns, incidence.gap_totals, incidence.weights)
+                        for task in tasks]
+        
+        # Fusion déterministe des top_k locaux
+        merged = heapq.nlargest(top_k, itertools.chain(*partials),
+                                key=lambda entry: (entry[0], tuple(-j for j in entry[1])))
+        return [self._score_dhatu_set([all_dhatu[j] for j in combination], incidence)
+                for _, combination in merged]
+    
+    def enumerate_all_sets(self, test_corpus: Iterable[str] = None, top_k: int = 1) -> Dict[int, List[OptimizationResult]]:
+        """Parcourt les 2^n sets de dhātu en ordre de Gray, avec score incrémental
+
+        Deux sets consécutifs ne diffèrent que d'un dhātu : les unités couvertes
+        par texte sont mises à jour en ajoutant ou retirant une seule colonne
+        (delta en O(textes)) au lieu d'être recalculées. Retourne, pour chaque
+        taille, les top_k sets par couverture décroissante (ordre lexical en
+        cas d'égalité).
+        """
+        if test_corpus is None:
+            test_corpus = self._get_default_test_corpus()
+        incidence = self._corpus_incidence(test_corpus)
+        all_dhatu = list(self.extended_dhatu_patterns.keys())
+        columns = [incidence.columns[name] for name in all_dhatu]
+        gap_totals = incidence.gap_totals
+        n = len(all_dhatu)
+        
+        covered = [0] * incidence.row_count
+        members = set()
+        heaps = defaultdict(list)
+        
+        for step in range(1, 2 ** n):
+            # Le bit modifié entre gray(step - 1) et gray(step) est le bit de poids faible de step
+            bit = (step & -step).bit_length() - 1
+            if bit in members:
+                members.remove(bit)
+                covered = list(map(operator.sub, covered, columns[bit]))
+            else:
+                members.add(bit)
+                covered = list(map(operator.add, covered, columns[bit]))
             
-            # Estimer les concepts totaux (y compris gaps)
-            for gap in result['semantic_gaps']:
-                semantic_concepts_total.add(gap.semantic_category)
+            coverage = self._average_coverage(covered, gap_totals, incidence.weights)
+            heap = heaps[len(members)]
+            entry = (coverage, tuple(-j for j in sorted(members)))
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        
+        return {
+            size: [self._score_dhatu_set([all_dhatu[-j] for j in negated], incidence)
+                   for _, negated in sorted(heaps[size], reverse=True)]
+            for size in sorted(heaps)
+        }
+    
+    def _evaluate_dhatu_set(self, dhatu_set: List[str], test_corpus: Iterable[str]) -> OptimizationResult:
+        """Évalue un set specific de dhātu sur le corpus de test"""
+        return self._score_dhatu_set(dhatu_set, self._corpus_incidence(test_corpus))
+    
+    def _corpus_incidence(self, test_corpus: Iterable[str], chunk_size: int = 1000) -> CorpusIncidence:
+        """Scanne le corpus une seule fois avec tous les dhātu étendus (mis en cache)
+
+        test_corpus : liste de textes (cache par empreinte du contenu), chemin d'un fichier
+        de corpus (cache par chemin, date et taille, lu en flux via
+        corpus_reader), corpus pré-tokenisé (TokenizedCorpus ou son
+        répertoire) ou flux de textes quelconque (consommé, non mis en cache).
+        Le corpus est analysé par lots de chunk_size textes. La clé de cache
+        inclut l'empreinte du jeu 'extended' : un fichier de patterns modifié
+        invalide les matrices ; seules les INCIDENCE_CACHE_SIZE dernières
+        sont gardées.
+        """
+        full_analyzer = SemanticCoverageAnalyzer(pattern_set='extended')
+        key = _corpus_cache_key(test_corpus)
+        if key is not None:
+            key = (full_analyzer.pattern_bank.fingerprint,) + key
+            cached = self._incidence_cache.get(key)
+            if cached is not None:
+                self._incidence_cache.move_to_end(key)
+                return cached
         
-        avg_coverage = sum(total_coverage) / len(total_coverage) if total_coverage else 0
+        dhatu_names = tuple(full_analyzer.dhatu_patterns)
+        n = len(dhatu_names)
+        signatures: Dict[Tuple[int, ...], int] = {}  # signature -> nombre de textes
+        overlaps = [[0] * n for _ in range(n)]
+        match_totals = [0] * n
+        present_gaps = set()
+        text_count = 0
+        
+        texts = iter_texts(test_corpus) if isinstance(test_corpus, str) else test_corpus
+        for chunk in iter_chunks(texts, chunk_size):
+            batch = full_analyzer.analyze_many(chunk)
+            for t, gap_total in enumerate(batch.gap_totals):
+                signature = tuple(batch.dhatu_counts[t * n:(t + 1) * n]) + (gap_total,)
+                signatures[signature] = signatures.get(signature, 0) + 1
+            _overlap_matrix(batch, n, overlaps)
+            match_totals = list(map(operator.add, match_totals, batch.dhatu_totals().values()))
+            present_gaps.update(batch.present_gaps())
+            text_count += len(batch)
+        
+        incidence = CorpusIncidence(
+            dhatu_names=dhatu_names,
+            columns={name: array('l', (signature[j] for signature in signatures))
+                     for j, name in enumerate(dhatu_names)},
+            gap_totals=array('l', (signature[n] for signature in signatures)),
+            gap_categories={full_analyzer.gap_patterns[name]['category'] for name in present_gaps},
+            text_count=text_count,
+            weights=array('l', signatures.values()),
+            overlaps=overlaps,
+            match_totals=match_totals
+        )
+        if key is not None:
+            self._incidence_cache[key] = incidence
+            if len(self._incidence_cache) > INCIDENCE_CACHE_SIZE:
+                self._incidence_cache.popitem(last=False)
+        return incidence
+    
+    def _score_dhatu_set(self, dhatu_set: List[str], incidence: CorpusIncidence) -> OptimizationResult:
+        """Évalue un set de dhātu à partir de la matrice d'incidence, sans regex"""
+        
+        temp_patterns = {k: v for k, v in self.extended_dhatu_patterns.items() if k in dhatu_set}
+        columns = [incidence.columns[name] for name in temp_patterns]
+        
+        # Unités couvertes par texte = somme des colonnes du set
+        if columns:
+            covered_units = map(sum, zip(*columns))
+        else:
+            covered_units = itertools.repeat(0, incidence.row_count)
+        
+        # Concepts sémantiques couverts (dhātu détectés) et totaux estimés (gaps)
+        semantic_concepts_covered = {temp_patterns[name]['concepts'][0]
+                                     for name, column in zip(temp_patterns, columns) if any(column)}
+        semantic_concepts_total = incidence.gap_categories
+        
+        avg_coverage = self._average_coverage(covered_units, incidence.gap_totals, incidence.weights)
         semantic_completeness = len(semantic_concepts_covered) / max(len(semantic_concepts_covered) + len(semantic_concepts_total), 1) * 100
         efficiency_ratio = avg_coverage / len(dhatu_set) if dhatu_set else 0
         
         # Calculer la redondance (concepts qui se chevauchent)
-        redundancy_score = self._calculate_redundancy(dhatu_set, temp_patterns)
+        redundancy_score = self._calculate_redundancy(dhatu_set, incidence)
         
         return OptimizationResult(
             dhatu_set=dhatu_set,
@@ -194,26 +635,20 @@ class DhatuSetOptimizer:
             redundancy_score=redundancy_score
         )
     
-    def _calculate_redundancy(self, dhatu_set: List[str], patterns: Dict) -> float:
-        """Calcule le score de redondance entre dhātu (patterns qui se chevauchent)"""
-        
-        # Analyse simple : compter les mots-clés partagés entre patterns
-        all_words = defaultdict(list)
-        
-        for dhatu_name in dhatu_set:
-            if dhatu_name in patterns:
-                for pattern in patterns[dhatu_name]['patterns']:
-                    # Extraire les mots des patterns regex
-                    words = pattern.replace(r'\b', '').replace('(', '').replace(')', '').split('|')
-                    for word in words:
-                        if word.strip():
-                            all_words[word.strip().lower()].append(dhatu_name)
-        
-        # Calculer le pourcentage de mots partagés
-        shared_words = sum(1 for dhatu_list in all_words.values() if len(dhatu_list) > 1)
-        total_words = len(all_words)
-        
-        return (shared_words / total_words * 100) if total_words > 0 else 0
+    def _calculate_redundancy(self, dhatu_set: List[str], incidence: CorpusIncidence) -> float:
+        """Calcule le score de redondance entre dhātu (matches qui se chevauchent)
+
+        Lecture de la sous-matrice de chevauchement du set, en O(k²) : paires
+        de matches de dhātu différents recouvrant le même texte, rapportées au
+        nombre de matches du set (plafonné à 100 %).
+        """
+        index = incidence.dhatu_index
+        members = sorted({index[name] for name in dhatu_set if name in index})
+        
+        shared_pairs = sum(incidence.overlaps[i][j] for a, i in enumerate(members) for j in members[a + 1:])
+        total_matches = sum(incidence.match_totals[i] for i in members)
+        
+        return min(shared_pairs / total_matches * 100, 100.0) if total_matches > 0 else 0
     
     def _get_default_test_corpus(self) -> List[str]:
         """Corpus de test par défaut pour l'optimisation"""
@@ -235,8 +670,14 @@ class DhatuSetOptimizer:
             "This pattern groups similar items and sequences them logically"
         ]
     
-    def _analyze_optimization_results(self, results_by_size: Dict, target_coverage: float) -> Dict:
-        """Analyse les résultats d'optimisation pour identifier les patterns"""
+    def _analyze_optimization_results(self, collector: ResultCollector, target_coverage: float,
+                                      exact: bool = False) -> Dict:
+        """Analyse les résultats d'optimisation pour identifier les patterns
+
+        En recherche exacte, le collecteur ne reçoit que les top_k sets de
+        chaque taille : leur moyenne est publiée sous 'avg_topk_coverage' et
+        non 'avg_coverage' (moyenne de tous les sets évalués).
+        """
         
         analysis = {
             'coverage_progression': {},
@@ -245,12 +686,12 @@ class DhatuSetOptimizer:
             'optimal_size': None
         }
         
-        for size, results in results_by_size.items():
-            best_for_size = max(results, key=lambda x: x.coverage_score)
+        for size, stats in collector.stats.items():
+            best_for_size = stats.best
             analysis['coverage_progression'][size] = {
                 'best_coverage': best_for_size.coverage_score,
                 'best_efficiency': best_for_size.efficiency_ratio,
-                'avg_coverage': sum(r.coverage_score for r in results) / len(results)
+                'avg_topk_coverage' if exact else 'avg_coverage': stats.mean_coverage
             }
             
             # Identifier la taille minimale viable (atteint la cible)
@@ -304,8 +745,11 @@ class DhatuSetOptimizer:
         
         return recommendations
 
-def main():
+def main(argv: List[str] = None):
     """Fonction de test et démonstration"""
+    parser = argparse.ArgumentParser(description="Optimiseur de set minimal dhātu")
+    parser.add_argument('--corpus', help="Corpus de test lu en flux (.jsonl, .json prompts_child ou texte, éventuellement .gz)")
+    args = parser.parse_args(argv)
     optimizer = DhatuSetOptimizer()
     
     print("⚡ OPTIMISEUR DE SET MINIMAL DHĀTU")
@@ -320,7 +764,8 @@ def main():
         
         result = optimizer.find_minimal_optimal_set(
             target_coverage=target,
-            max_dhatu=12
+            max_dhatu=12,
+            test_corpus=args.corpus
         )
         
         if result['optimal_result']:
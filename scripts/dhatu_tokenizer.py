@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Flux de tokens pour les analyseurs dhātu
+Tokenise un texte une seule fois en un tableau compact d'offsets de mots,
+réutilisé par la détection de gaps et les statistiques de couverture
+"""
+
+import re
+from array import array
+from itertools import chain
+from typing import Iterator, Tuple
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+class TokenStream:
+    """Offsets [début, fin) des mots d'un texte, entrelacés dans un array('l')"""
+
+    __slots__ = ('text', 'offsets')
+
+    def __init__(self, text: str, offsets: array):
+        self.text = text
+        self.offsets = offsets  # début0, fin0, début1, fin1, ...
+
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+
+    def spans(self) -> Iterator[Tuple[int, int]]:
+        """Itère sur les (début, fin) des mots, dans l'ordre du texte"""
+        offsets = self.offsets
+        return zip(offsets[0::2], offsets[1::2])
+
+    def word(self, index: int) -> str:
+        return self.text[self.offsets[2 * index]:self.offsets[2 * index + 1]]
+
+def tokenize(text: str) -> TokenStream:
+    """Découpe le texte en mots (\\b\\w+\\b) en une seule passe"""
+    offsets = array('l', chain.from_iterable(m.span() for m in WORD_PATTERN.finditer(text)))
+    return TokenStream(text, offsets)
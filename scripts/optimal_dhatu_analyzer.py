@@ -6,149 +6,319 @@ Version post-découverte du 7 septembre 2025
 """
 import re
 import json
-from typing import List, Dict, Set, Any
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
+from dhatu_pattern_bank import BankPattern, PatternBank
+from dhatu_pattern_registry import get_pattern_set
+from dhatu_records import SlotRecord
+from dhatu_tokenizer import TokenStream
+from dhatu_segmenter import is_gap_word, tokenize_for_language
+from dhatu_columnar import ColumnarAnalysis
+from dhatu_match_cache import MatchCache
+from dhatu_memo import AnalysisMemo
+from dhatu_profiler import PatternProfiler
+
+# Patterns de concepts potentiellement manqués
+CONCEPT_PATTERNS = {
+    'TIME': re.compile(r'\b(time|when|before|after|during|now|then|today|yesterday|tomorrow)\b', re.IGNORECASE),
+    'SPACE': re.compile(r'\b(where|here|there|location|place|position|near|far|inside|outside)\b', re.IGNORECASE),
+    'QUANTITY': re.compile(r'\b(how much|many|few|more|less|number|amount|size|big|small)\b', re.IGNORECASE),
+    'IDENTITY': re.compile(r'\b(who|what|which|this|that|same|different|other|another)\b', re.IGNORECASE)
+}
+
+def suggest_missing_concepts(word: str) -> List[str]:
+    """Suggère concepts manquants pour un mot non couvert"""
+    suggestions = [concept for concept, pattern in CONCEPT_PATTERNS.items() if pattern.search(word)]
+    return suggestions or ['UNKNOWN']
+
+class DhatuMatch(SlotRecord):
+    """Détection d'un dhātu : patterns de la banque (partagés), texte, offsets
+
+    pattern et context sont lus à la demande ; le contexte (20 caractères
+    de part et d'autre) n'est découpé que si un rapport l'affiche.
+    """
+    __slots__ = ('_patterns', '_text', '_index', '_start', '_end')
+    _fields = ('dhatu', 'pattern', 'position', 'context')
+    
+    def __init__(self, patterns: Tuple[BankPattern, ...], text: str, index: int, start: int, end: int):
+        self._patterns = patterns
+        self._text = text
+        self._index = index
+        self._start = start
+        self._end = end
+    
+    @property
+    def dhatu(self) -> str:
+        return self._patterns[self._index].category
+    
+    @property
+    def pattern(self) -> str:
+        return self._patterns[self._index].source
+    
+    @property
+    def position(self) -> int:
+        return self._start
+    
+    @property
+    def context(self) -> str:
+        return self._text[max(0, self._start-20):self._end+20]
+
+class SemanticGap(SlotRecord):
+    """Mot non couvert ; les concepts manquants sont suggérés à la première lecture"""
+    __slots__ = ('_text', '_start', '_end', '_missing_concepts')
+    _fields = ('text', 'position', 'missing_concepts')
+    
+    def __init__(self, text: str, start: int, end: int):
+        self._text = text
+        self._start = start
+        self._end = end
+        self._missing_concepts = None
+    
+    @property
+    def text(self) -> str:
+        return self._text[self._start:self._end]
+    
+    @property
+    def position(self) -> int:
+        return self._start
+    
+    @property
+    def missing_concepts(self) -> List[str]:
+        if self._missing_concepts is None:
+            self._missing_concepts = tuple(suggest_missing_concepts(self.text))
+        return list(self._missing_concepts)
+
+# Intervalle de caractères [début, fin)
+Interval = Tuple[int, int]
 
 @dataclass
-class DhatuMatch:
-    dhatu: str
-    pattern: str
-    position: int
-    context: str
-
-@dataclass 
-class SemanticGap:
-    text: str
-    position: int
-    missing_concepts: List[str]
+class WordSweep:
+    """Résultat du balayage des mots contre les intervalles couverts"""
+    total_words: int
+    covered_words: int
+    uncovered_words: List[Interval]
+
+def _merge_intervals(spans: List[Interval]) -> List[Interval]:
+    """Fusionne des spans en intervalles triés, disjoints et non vides"""
+    merged = []
+    for start, end in sorted(spans):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
 
 class OptimalDhatuAnalyzer:
     """Analyseur basé sur les 9 dhātu optimaux découverts"""
     
-    def __init__(self):
-        # 9 DHĀTU OPTIMAUX identifiés le 7 septembre 2025
-        self.dhatu_patterns = {
-            # Dhātu conservés (5) - Patterns étendus
-            'COMM': [
-                r'\b(communicat|talk|speak|tell|say|message|signal|transmit|send|receive|exchange|share|inform|discuss|chat|announce)\w*',
-                r'\b(dialogue|conversation|report|notify|explain|describe|express|mention|state|declare)\w*'
-            ],
-            'ITER': [
-                r'\b(repeat|iterate|loop|again|cycle|recur|traverse|scan|walk|each|every|all|while|continue)\w*',
-                r'\b(process|procedure|step|sequence|series|chain|flow|running|moving|going)\w*'
-            ],
-            'DECIDE': [
-                r'\b(decide|choose|select|pick|if|else|when|switch|case|option|alternative|decision)\w*',
-                r'\b(condition|branch|determine|resolve|settle|choice|prefer|want|need|require)\w*'
-            ],
-            
-            # Nouveaux dhātu essentiels (4) - Patterns étendus
-            'EXIST': [
-                r'\b(exist|be|is|are|was|were|being|presence|available|there|here|system|thing|object)\w*',
-                r'\b(create|delete|new|remove|add|insert|define|declare|have|has|had|contain)\w*'
-            ],
-            'EVAL': [
-                r'\b(evaluat|assess|judge|measure|test|check|verify|valid|correct|wrong|better|best)\w*',
-                r'\b(quality|good|bad|worse|worst|compare|equal|different|help|improve|enhance)\w*'
-            ],
-            'CAUSE': [
-                r'\b(cause|because|reason|why|trigger|initiate|start|begin|end|result|effect|make)\w*',
-                r'\b(due to|leads to|results in|makes|forces|prevents|allows|enable|disable)\w*'
-            ],
-            'MODAL': [
-                r'\b(can|could|may|might|must|should|would|will|shall|possible|impossible|able)\w*',
-                r'\b(ability|capability|permission|obligation|necessity|probability|potential)\w*'
-            ],
-            'RELATE': [
-                r'\b(relat|connect|link|join|bind|attach|associate|refer|point|belongs|with|between)\w*',
-                r'\b(among|relationship|connection|reference|dependency|about|their|this|that)\w*'
-            ],
-            'FEEL': [
-                r'\b(feel|emotion|happy|sad|angry|fear|love|hate|like|dislike|enjoy|experience)\w*',
-                r'\b(sentiment|mood|attitude|preference|reaction|response|satisfaction|comfort)\w*'
-            ]
-        }
+    def __init__(self, match_cache: MatchCache = None, memo_capacity: int = 0, profile: bool = False,
+                 pattern_set: str = 'optimal'):
+        self._pattern_bank = None
+        self._profile = profile
+        self._match_cache = match_cache
+        # Memo opt-in : résultats figés des textes déjà analysés
+        self._memo = AnalysisMemo(memo_capacity) if memo_capacity else None
+        # 9 DHĀTU OPTIMAUX identifiés le 7 septembre 2025 (jeu partagé 'optimal')
+        self._patterns = get_pattern_set(pattern_set)
+        self._dhatu_patterns = None
+    
+    @property
+    def dhatu_patterns(self) -> Mapping[str, Sequence[str]]:
+        if self._dhatu_patterns is None:
+            return self._patterns.dhatu
+        return self._dhatu_patterns
+    
+    @dhatu_patterns.setter
+    def dhatu_patterns(self, patterns: Dict[str, List[str]]):
+        # Remplacer les patterns invalide la banque compilée et le memo
+        self._dhatu_patterns = patterns
+        self._pattern_bank = None
+        if self._memo is not None:
+            self._memo.clear()
+    
+    @property
+    def pattern_bank(self) -> PatternBank:
+        """Banque des 9 dhātu (mots-clés littéraux via Aho-Corasick), partagée
+
+        Compilée à la première utilisation si les patterns ont été remplacés.
+        """
+        if self._pattern_bank is None:
+            if self._dhatu_patterns is None:
+                bank = self._patterns.bank
+            else:
+                bank = PatternBank({'dhatu': self._dhatu_patterns})
+            if self._match_cache is not None or self._profile:
+                bank = bank.derive(self._match_cache)
+                if self._profile:
+                    bank.profiler = PatternProfiler(bank)
+            self._pattern_bank = bank
+        return self._pattern_bank
+    
+    @property
+    def match_cache(self) -> MatchCache:
+        """Cache persistant des détections (None : pas de cache)"""
+        return self._match_cache
+    
+    @match_cache.setter
+    def match_cache(self, cache: MatchCache):
+        self._match_cache = cache
+        if self._pattern_bank is not None:
+            if self._pattern_bank.frozen:
+                self._pattern_bank = None  # banque partagée : dérivée au prochain accès
+            else:
+                self._pattern_bank.match_cache = cache
+    
+    @property
+    def profiler(self) -> Optional[PatternProfiler]:
+        """Compteurs par pattern en mode profilage (None : désactivé)
+
+        Seuls les scans effectifs sont comptés : un texte servi par le memo
+        n'est pas rescanné.
+        """
+        return self.pattern_bank.profiler if self._profile else None
+    
+    @property
+    def memo(self) -> Optional[AnalysisMemo]:
+        """Memo LRU de analyze_text (None : désactivé)"""
+        return self._memo
+    
+    @memo.setter
+    def memo(self, memo: Optional[AnalysisMemo]):
+        self._memo = memo
         
-    def analyze_text(self, text: str) -> Dict[str, Any]:
-        """Analyse un texte avec les 9 dhātu optimaux"""
+    def tokenize(self, text: str, lang: str = None) -> TokenStream:
+        """Étape de tokenisation, exécutée une fois par texte
+
+        Les écritures sans espaces (sinogrammes, kana) sont segmentées par
+        maximum matching sur le lexique de la langue (voir dhatu_segmenter).
+        """
+        return tokenize_for_language(text, lang)
+        
+    def analyze_text(self, text: str, tokens: TokenStream = None, lang: str = None) -> Dict[str, Any]:
+        """Analyse un texte avec les 9 dhātu optimaux
+
+        tokens : flux de tokens déjà calculé pour ce texte (sinon tokenisé ici)
+        lang : code de langue pour la segmentation (sinon déduit de l'écriture)
+        Avec un memo, un texte déjà vu retourne le résultat figé en cache.
+        """
+        memo = self._memo
+        if memo is None:
+            return self._analyze_text(text, tokens, lang)
+        key = (lang, text) if lang else text
+        result = memo.get(key)
+        if result is None:
+            result = memo.put(key, self._analyze_text(text, tokens, lang))
+        return result
+    
+    def _analyze_text(self, text: str, tokens: TokenStream = None, lang: str = None) -> Dict[str, Any]:
+        if tokens is None:
+            tokens = self.tokenize(text, lang)
         matches = []
-        covered_positions = set()
+        spans = []
+        bank = self.pattern_bank
+        
+        patterns = bank.patterns
+        
+        # Ordre historique : par dhātu, puis par pattern, puis par position
+        for index, start, end in sorted(bank.scan(text)):
+            matches.append(DhatuMatch(patterns, text, index, start, end))
+            spans.append((start, end))
         
-        for dhatu, patterns in self.dhatu_patterns.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, text, re.IGNORECASE):
-                    matches.append(DhatuMatch(
-                        dhatu=dhatu,
-                        pattern=pattern,
-                        position=match.start(),
-                        context=text[max(0, match.start()-20):match.end()+20]
-                    ))
-                    covered_positions.update(range(match.start(), match.end()))
+        # Couverture en intervalles fusionnés, un seul balayage des mots
+        covered = _merge_intervals(spans)
+        sweep = self._sweep_words(covered, tokens)
         
         # Calculer gaps sémantiques
-        gaps = self._find_semantic_gaps(text, covered_positions)
+        gaps = self._find_semantic_gaps(text, sweep)
         
         return {
             'text': text,
             'dhatu_matches': matches,
             'semantic_gaps': gaps,
-            'coverage_stats': self._calculate_coverage(text, covered_positions),
+            'coverage_stats': self._calculate_coverage(text, covered, sweep),
             'dhatu_distribution': self._dhatu_distribution(matches)
         }
     
-    def _find_semantic_gaps(self, text: str, covered_positions: Set[int]) -> List[SemanticGap]:
+    def analyze_many(self, texts: Iterable[Union[str, TokenStream]]) -> ColumnarAnalysis:
+        """Analyse un lot de textes et retourne des résultats en colonnes
+
+        coverage contient la semantic_coverage de chaque texte ; gap_totals
+        le nombre de gaps (mots non couverts retenus par is_gap_word).
+        Les éléments peuvent être des TokenStream déjà calculés (par exemple
+        TokenizedCorpus.iter_token_streams()) : ils ne sont pas re-tokenisés.
+        """
+        bank = self.pattern_bank
+        dhatu_names = tuple(self.dhatu_patterns)
+        columns = [dhatu_names.index(p.category) for p in bank.patterns]
+        result = ColumnarAnalysis(dhatu_names)
+        
+        for text_index, item in enumerate(texts):
+            tokens = item if isinstance(item, TokenStream) else self.tokenize(item)
+            text = tokens.text
+            row = [0] * len(dhatu_names)
+            spans = []
+            for index, start, end in sorted(bank.scan(text)):
+                row[columns[index]] += 1
+                spans.append((start, end))
+                result.match_text.append(text_index)
+                result.match_dhatu.append(columns[index])
+                result.match_start.append(start)
+                result.match_end.append(end)
+            covered = _merge_intervals(spans)
+            sweep = self._sweep_words(covered, tokens)
+            coverage = self._calculate_coverage(text, covered, sweep)
+            result.coverage.append(coverage['semantic_coverage'])
+            result.dhatu_counts.extend(row)
+            result.gap_totals.append(sum(1 for start, end in sweep.uncovered_words if is_gap_word(text, start, end)))
+        
+        return result
+    
+    def _sweep_words(self, covered: List[Interval], tokens: TokenStream) -> WordSweep:
+        """Balaye mots et intervalles couverts en parallèle (fusion de deux listes triées)"""
+        covered_words = 0
+        uncovered_words = []
+        i = 0
+        for start, end in tokens.spans():
+            # Sauter les intervalles entièrement avant le mot
+            while i < len(covered) and covered[i][1] <= start:
+                i += 1
+            if i < len(covered) and covered[i][0] < end:
+                covered_words += 1
+            else:
+                uncovered_words.append((start, end))
+        return WordSweep(len(tokens), covered_words, uncovered_words)
+    
+    def _find_semantic_gaps(self, text: str, sweep: WordSweep) -> List[SemanticGap]:
         """Identifie les gaps sémantiques non couverts par les 9 dhātu"""
         gaps = []
-        words = re.finditer(r'\b\w+\b', text)
         
-        for word_match in words:
-            if not any(pos in covered_positions for pos in range(word_match.start(), word_match.end())):
-                word = word_match.group()
-                if len(word) > 3:  # Ignorer mots très courts
-                    gaps.append(SemanticGap(
-                        text=word,
-                        position=word_match.start(),
-                        missing_concepts=self._suggest_missing_concepts(word)
-                    ))
+        for start, end in sweep.uncovered_words:
+            if is_gap_word(text, start, end):  # Ignorer mots très courts (selon l'écriture)
+                gaps.append(SemanticGap(text, start, end))
         
         return gaps
     
     def _suggest_missing_concepts(self, word: str) -> List[str]:
         """Suggère concepts manquants pour un mot non couvert"""
-        suggestions = []
-        
-        # Patterns de concepts potentiellement manqués
-        concept_patterns = {
-            'TIME': r'\b(time|when|before|after|during|now|then|today|yesterday|tomorrow)\b',
-            'SPACE': r'\b(where|here|there|location|place|position|near|far|inside|outside)\b',  
-            'QUANTITY': r'\b(how much|many|few|more|less|number|amount|size|big|small)\b',
-            'IDENTITY': r'\b(who|what|which|this|that|same|different|other|another)\b'
-        }
-        
-        for concept, pattern in concept_patterns.items():
-            if re.search(pattern, word, re.IGNORECASE):
-                suggestions.append(concept)
-        
-        return suggestions or ['UNKNOWN']
+        return suggest_missing_concepts(word)
     
-    def _calculate_coverage(self, text: str, covered_positions: Set[int]) -> Dict[str, float]:
+    def _calculate_coverage(self, text: str, covered: List[Interval], sweep: WordSweep) -> Dict[str, float]:
         """Calcule statistiques de couverture"""
         total_chars = len(text)
-        covered_chars = len(covered_positions)
-        
-        words = re.findall(r'\b\w+\b', text)
-        total_words = len(words)
+        covered_chars = sum(end - start for start, end in covered)
         
-        # Compter mots couverts
-        covered_words = 0
-        for word_match in re.finditer(r'\b\w+\b', text):
-            if any(pos in covered_positions for pos in range(word_match.start(), word_match.end())):
-                covered_words += 1
+        total_words = sweep.total_words
+        covered_words = sweep.covered_words
         
         return {
             'char_coverage': covered_chars / total_chars if total_chars > 0 else 0,
             'word_coverage': covered_words / total_words if total_words > 0 else 0,
-            'semantic_coverage': (covered_chars / total_chars * 0.7 + covered_words / total_words * 0.3) if total_chars > 0 else 0
+            # Texte sans mot (ponctuation, espaces) : seule la part caractères compte
+            'semantic_coverage': (covered_chars / total_chars * 0.7 +
+                                  (covered_words / total_words * 0.3 if total_words > 0 else 0)) if total_chars > 0 else 0
         }
     
     def _dhatu_distribution(self, matches: List[DhatuMatch]) -> Dict[str, int]:
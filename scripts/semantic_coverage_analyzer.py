@@ -4,152 +4,206 @@ Analyseur de Couverture Sémantique pour Dhātu PaniniFS
 Mesure la couverture des 7 dhātu actuels et identifie les gaps sémantiques
 """
 
-import re
 import json
-from typing import Dict, List, Set, Tuple
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
 from collections import defaultdict
+from dhatu_pattern_bank import PatternBank, BankHit
+from dhatu_pattern_registry import get_pattern_set
+from dhatu_records import SlotRecord
+from dhatu_columnar import ColumnarAnalysis
+from dhatu_match_cache import MatchCache
+from dhatu_memo import AnalysisMemo
+from dhatu_profiler import PatternProfiler
 
-@dataclass
-class DhatuMatch:
-    """Représente une détection de dhātu dans un texte"""
-    dhatu: str
-    concept: str
-    text_fragment: str
-    confidence: float
-    position: Tuple[int, int]  # start, end
+# Libellés par index de pattern de la banque : (dhātu, concept) ou (gap, catégorie)
+PatternLabels = Tuple[Tuple[str, str], ...]
 
-@dataclass
-class SemanticGap:
+class DhatuMatch(SlotRecord):
+    """Représente une détection de dhātu dans un texte
+
+    Ne stocke que le texte (partagé), la table de libellés de la banque,
+    l'index du pattern et les offsets ; les champs sont calculés à la lecture.
+    """
+    __slots__ = ('_labels', '_text', '_index', '_start', '_end')
+    _fields = ('dhatu', 'concept', 'text_fragment', 'confidence', 'position')
+    
+    def __init__(self, labels: PatternLabels, text: str, index: int, start: int, end: int):
+        self._labels = labels
+        self._text = text
+        self._index = index
+        self._start = start
+        self._end = end
+    
+    @property
+    def dhatu(self) -> str:
+        return self._labels[self._index][0]
+    
+    @property
+    def concept(self) -> str:
+        return self._labels[self._index][1]  # Concept principal
+    
+    @property
+    def text_fragment(self) -> str:
+        return self._text[self._start:self._end]
+    
+    @property
+    def confidence(self) -> float:
+        return 0.8  # Score par défaut
+    
+    @property
+    def position(self) -> Tuple[int, int]:  # start, end
+        return (self._start, self._end)
+
+class SemanticGap(SlotRecord):
     """Représente un concept non couvert par les dhātu actuels"""
-    text_fragment: str
-    semantic_category: str
-    suggested_concepts: List[str]
-    position: Tuple[int, int]
+    __slots__ = ('_labels', '_text', '_index', '_start', '_end')
+    _fields = ('text_fragment', 'semantic_category', 'suggested_concepts', 'position')
+    
+    def __init__(self, labels: PatternLabels, text: str, index: int, start: int, end: int):
+        self._labels = labels
+        self._text = text
+        self._index = index
+        self._start = start
+        self._end = end
+    
+    @property
+    def text_fragment(self) -> str:
+        return self._text[self._start:self._end]
+    
+    @property
+    def semantic_category(self) -> str:
+        return self._labels[self._index][1]
+    
+    @property
+    def suggested_concepts(self) -> List[str]:
+        return [self._labels[self._index][0].lower()]
+    
+    @property
+    def position(self) -> Tuple[int, int]:
+        return (self._start, self._end)
 
 class SemanticCoverageAnalyzer:
     """Analyseur principal de couverture sémantique"""
     
-    def __init__(self):
-        self.dhatu_patterns = {
-            'COMM': {
-                'patterns': [
-                    r'\b(print|echo|say|tell|communicate|speak|write|message|send|receive)\b',
-                    r'\b(affiche|dit|communique|parle|écrit|message|envoie|reçoit)\b',
-                    r'\b(console\.log|printf|puts|std::cout)\b'
-                ],
-                'concepts': ['communication', 'output', 'expression', 'transmission']
-            },
-            'ITER': {
-                'patterns': [
-                    r'\b(for|while|loop|repeat|each|iterate|map|forEach)\b',
-                    r'\b(pour|tant que|boucle|répète|chaque|itère)\b',
-                    r'\b(do.*while|for.*in|range\()\b'
-                ],
-                'concepts': ['repetition', 'iteration', 'traversal', 'enumeration']
-            },
-            'TRANS': {
-                'patterns': [
-                    r'\b(transform|convert|parse|filter|modify|change|update)\b',
-                    r'\b(transforme|convertit|analyse|filtre|modifie|change|met à jour)\b',
-                    r'\b(map\(|filter\(|reduce\()\b'
-                ],
-                'concepts': ['transformation', 'conversion', 'modification', 'processing']
-            },
-            'DECIDE': {
-                'patterns': [
-                    r'\b(if|else|switch|case|choose|decide|when|unless)\b',
-                    r'\b(si|sinon|choisit|décide|quand|à moins que)\b',
-                    r'\b(ternary|conditional|branch)\b'
-                ],
-                'concepts': ['decision', 'choice', 'branching', 'condition']
-            },
-            'LOCATE': {
-                'patterns': [
-                    r'\b(find|search|locate|seek|get|fetch|retrieve)\b',
-                    r'\b(trouve|cherche|localise|obtient|récupère)\b',
-                    r'\b(indexOf|querySelector|grep)\b'
-                ],
-                'concepts': ['location', 'search', 'retrieval', 'finding']
-            },
-            'GROUP': {
-                'patterns': [
-                    r'\b(group|cluster|collect|gather|aggregate|array|list)\b',
-                    r'\b(groupe|rassemble|collecte|agrège|tableau|liste)\b',
-                    r'\b(\[.*\]|Array\(|new.*\[\])\b'
-                ],
-                'concepts': ['grouping', 'collection', 'aggregation', 'clustering']
-            },
-            'SEQ': {
-                'patterns': [
-                    r'\b(sort|order|sequence|first|last|next|prev|step)\b',
-                    r'\b(trie|ordonne|séquence|premier|dernier|suivant|précédent|étape)\b',
-                    r'\b(before|after|then|finally)\b'
-                ],
-                'concepts': ['sequencing', 'ordering', 'progression', 'steps']
-            }
-        }
-        
-        # Patterns pour identifier les gaps sémantiques
-        self.gap_patterns = {
-            'EMOTIONAL': {
-                'patterns': [
-                    r'\b(elegant|beautiful|ugly|love|hate|like|prefer|enjoy)\b',
-                    r'\b(élégant|beau|laid|aime|déteste|préfère|apprécie)\b',
-                    r'\b(satisfying|frustrating|exciting|boring)\b'
-                ],
-                'category': 'Dimension Émotionnelle/Qualitative'
-            },
-            'CAUSAL': {
-                'patterns': [
-                    r'\b(because|since|therefore|thus|consequently|due to|results in)\b',
-                    r'\b(parce que|puisque|donc|ainsi|par conséquent|à cause de|résulte en)\b',
-                    r'\b(causes?|effects?|leads to|triggers)\b'
-                ],
-                'category': 'Dimension Causale/Temporelle'
-            },
-            'RELATIONAL': {
-                'patterns': [
-                    r'\b(relates to|in relation to|compared to|versus|opposite|similar)\b',
-                    r'\b(en relation avec|par rapport à|comparé à|opposé|similaire)\b',
-                    r'\b(analogy|metaphor|like|as)\b'
-                ],
-                'category': 'Dimension Relationnelle/Contextuelle'
-            },
-            'EXISTENTIAL': {
-                'patterns': [
-                    r'\b(exists?|there is|there are|being|essence|nature|reality)\b',
-                    r'\b(existe|il y a|être|essence|nature|réalité)\b',
-                    r'\b(possible|potential|maybe|might|could)\b'
-                ],
-                'category': 'Dimension Existentielle/Ontologique'
-            },
-            'TEMPORAL': {
-                'patterns': [
-                    r'\b(now|then|when|while|during|until|since|always|never)\b',
-                    r'\b(maintenant|alors|quand|pendant|jusqu\'à|depuis|toujours|jamais)\b',
-                    r'\b(timeline|schedule|chronology)\b'
-                ],
-                'category': 'Dimension Temporelle Complexe'
-            },
-            'SPATIAL': {
-                'patterns': [
-                    r'\b(above|below|inside|outside|near|far|between|around)\b',
-                    r'\b(au-dessus|en-dessous|dedans|dehors|près|loin|entre|autour)\b',
-                    r'\b(position|location|place|here|there)\b'
-                ],
-                'category': 'Dimension Spatiale/Géométrique'
-            }
-        }
+    def __init__(self, match_cache: MatchCache = None, memo_capacity: int = 0, profile: bool = False,
+                 pattern_set: str = 'semantic'):
+        self._pattern_bank = None
+        self._profile = profile
+        self._pattern_labels: PatternLabels = ()
+        self._match_cache = match_cache
+        # Memo opt-in : résultats figés des textes déjà analysés
+        self._memo = AnalysisMemo(memo_capacity) if memo_capacity else None
+        # Patterns du jeu partagé (dhatu_pattern_registry) tant qu'ils ne sont pas remplacés
+        self._patterns = get_pattern_set(pattern_set)
+        self._dhatu_patterns = None
+        self._gap_patterns = None
+    
+    @property
+    def dhatu_patterns(self) -> Mapping:
+        if self._dhatu_patterns is None:
+            return self._patterns.dhatu
+        return self._dhatu_patterns
+
+    @dhatu_patterns.setter
+    def dhatu_patterns(self, patterns: Dict):
+        # Remplacer les patterns invalide la banque compilée et le memo
+        self._dhatu_patterns = patterns
+        self._pattern_bank = None
+        if self._memo is not None:
+            self._memo.clear()
+
+    @property
+    def gap_patterns(self) -> Mapping:
+        if self._gap_patterns is None:
+            return self._patterns.gap
+        return self._gap_patterns
+
+    @gap_patterns.setter
+    def gap_patterns(self, patterns: Dict):
+        self._gap_patterns = patterns
+        self._pattern_bank = None
+        if self._memo is not None:
+            self._memo.clear()
+
+    @property
+    def pattern_bank(self) -> PatternBank:
+        """Scanner unique (dhātu + gaps) : banque partagée du jeu de patterns,
+        ou compilée à la première utilisation si les patterns ont été remplacés
+        """
+        if self._pattern_bank is None:
+            if self._dhatu_patterns is None and self._gap_patterns is None:
+                bank = self._patterns.bank
+            else:
+                bank = PatternBank({
+                    'dhatu': {name: info['patterns'] for name, info in self.dhatu_patterns.items()},
+                    'gap': {name: info['patterns'] for name, info in self.gap_patterns.items()}
+                })
+            if self._match_cache is not None or self._profile:
+                bank = bank.derive(self._match_cache)
+                if self._profile:
+                    bank.profiler = PatternProfiler(bank)
+            self._pattern_bank = bank
+            # Libellés partagés par tous les records issus de cette banque
+            self._pattern_labels = tuple(
+                (p.category, self.dhatu_patterns[p.category]['concepts'][0]) if p.kind == 'dhatu'
+                else (p.category, self.gap_patterns[p.category]['category'])
+                for p in self._pattern_bank.patterns)
+        return self._pattern_bank
+    
+    @property
+    def match_cache(self) -> MatchCache:
+        """Cache persistant des détections (None : pas de cache)"""
+        return self._match_cache
+    
+    @match_cache.setter
+    def match_cache(self, cache: MatchCache):
+        self._match_cache = cache
+        if self._pattern_bank is not None:
+            if self._pattern_bank.frozen:
+                self._pattern_bank = None  # banque partagée : dérivée au prochain accès
+            else:
+                self._pattern_bank.match_cache = cache
+    
+    @property
+    def profiler(self) -> Optional[PatternProfiler]:
+        """Compteurs par pattern en mode profilage (None : désactivé)
+
+        Seuls les scans effectifs sont comptés : un texte servi par le memo
+        n'est pas rescanné.
+        """
+        return self.pattern_bank.profiler if self._profile else None
+    
+    @property
+    def memo(self) -> Optional[AnalysisMemo]:
+        """Memo LRU de analyze_text (None : désactivé)"""
+        return self._memo
+    
+    @memo.setter
+    def memo(self, memo: Optional[AnalysisMemo]):
+        self._memo = memo
     
     def analyze_text(self, text: str) -> Dict:
-        """Analyse complète d'un texte pour identifier dhātu et gaps"""
+        """Analyse complète d'un texte pour identifier dhātu et gaps
+
+        Avec un memo, un texte déjà vu retourne le résultat figé en cache.
+        """
+        memo = self._memo
+        if memo is None:
+            return self._analyze_text(text)
+        result = memo.get(text)
+        if result is None:
+            result = memo.put(text, self._analyze_text(text))
+        return result
+    
+    def _analyze_text(self, text: str) -> Dict:
+        # Une seule passe sur le texte pour tous les patterns
+        hits = self.pattern_bank.scan(text)
         
         # Détection des dhātu existants
-        dhatu_matches = self._detect_dhatu(text)
+        dhatu_matches = self._detect_dhatu(text, hits)
         
         # Détection des gaps sémantiques
-        semantic_gaps = self._detect_semantic_gaps(text)
+        semantic_gaps = self._detect_semantic_gaps(text, hits)
         
         # Calcul de la couverture
         coverage_score = self._calculate_coverage(text, dhatu_matches, semantic_gaps)
@@ -162,38 +216,70 @@ class SemanticCoverageAnalyzer:
             'analysis_summary': self._generate_summary(dhatu_matches, semantic_gaps, coverage_score)
         }
     
-    def _detect_dhatu(self, text: str) -> List[DhatuMatch]:
+    def analyze_many(self, texts: Iterable[str]) -> ColumnarAnalysis:
+        """Analyse un lot de textes et retourne des résultats en colonnes
+
+        Même couverture que analyze_text, sans construire de DhatuMatch ni de
+        SemanticGap : seuls les comptes et les offsets sont conservés.
+        """
+        bank = self.pattern_bank
+        dhatu_names = tuple(self.dhatu_patterns)
+        gap_names = tuple(self.gap_patterns)
+        # Colonne de chaque pattern de la banque dans sa matrice
+        columns = [(dhatu_names if p.kind == 'dhatu' else gap_names).index(p.category)
+                   for p in bank.patterns]
+        is_dhatu = [p.kind == 'dhatu' for p in bank.patterns]
+        result = ColumnarAnalysis(dhatu_names, gap_names)
+        
+        for text_index, text in enumerate(texts):
+            dhatu_row = [0] * len(dhatu_names)
+            gap_row = [0] * len(gap_names)
+            for index, start, end in bank.scan(text):
+                if is_dhatu[index]:
+                    dhatu_row[columns[index]] += 1
+                    result.match_text.append(text_index)
+                    result.match_dhatu.append(columns[index])
+                    result.match_start.append(start)
+                    result.match_end.append(end)
+                else:
+                    gap_row[columns[index]] += 1
+            covered_units = sum(dhatu_row)
+            gap_units = sum(gap_row)
+            result.coverage.append(self._coverage_percentage(covered_units, gap_units))
+            result.dhatu_counts.extend(dhatu_row)
+            result.gap_counts.extend(gap_row)
+            result.gap_totals.append(gap_units)
+        
+        return result
+    
+    def _detect_dhatu(self, text: str, hits: List[BankHit] = None) -> List[DhatuMatch]:
         """Détecte les occurrences des dhātu existants"""
+        bank = self.pattern_bank
+        if hits is None:
+            hits = bank.scan(text)
         matches = []
         
-        for dhatu_name, dhatu_info in self.dhatu_patterns.items():
-            for pattern in dhatu_info['patterns']:
-                for match in re.finditer(pattern, text, re.IGNORECASE):
-                    matches.append(DhatuMatch(
-                        dhatu=dhatu_name,
-                        concept=dhatu_info['concepts'][0],  # Concept principal
-                        text_fragment=match.group(),
-                        confidence=0.8,  # Score par défaut
-                        position=(match.start(), match.end())
-                    ))
+        labels = self._pattern_labels
         
-        return sorted(matches, key=lambda x: x.position[0])
+        # Les détections sont déjà triées par position
+        for index, start, end in bank.kind_hits(hits, 'dhatu'):
+            matches.append(DhatuMatch(labels, text, index, start, end))
+        
+        return matches
     
-    def _detect_semantic_gaps(self, text: str) -> List[SemanticGap]:
+    def _detect_semantic_gaps(self, text: str, hits: List[BankHit] = None) -> List[SemanticGap]:
         """Détecte les concepts non couverts par les dhātu actuels"""
+        bank = self.pattern_bank
+        if hits is None:
+            hits = bank.scan(text)
         gaps = []
         
-        for gap_name, gap_info in self.gap_patterns.items():
-            for pattern in gap_info['patterns']:
-                for match in re.finditer(pattern, text, re.IGNORECASE):
-                    gaps.append(SemanticGap(
-                        text_fragment=match.group(),
-                        semantic_category=gap_info['category'],
-                        suggested_concepts=[gap_name.lower()],
-                        position=(match.start(), match.end())
-                    ))
+        labels = self._pattern_labels
+        
+        for index, start, end in bank.kind_hits(hits, 'gap'):
+            gaps.append(SemanticGap(labels, text, index, start, end))
         
-        return sorted(gaps, key=lambda x: x.position[0])
+        return gaps
     
     def _calculate_coverage(self, text: str, dhatu_matches: List[DhatuMatch], 
                           semantic_gaps: List[SemanticGap]) -> Dict:
@@ -202,19 +288,26 @@ class SemanticCoverageAnalyzer:
         total_semantic_units = len(dhatu_matches) + len(semantic_gaps)
         covered_units = len(dhatu_matches)
         
-        if total_semantic_units == 0:
-            coverage_percentage = 100.0
-        else:
-            coverage_percentage = (covered_units / total_semantic_units) * 100
-        
         return {
-            'percentage': round(coverage_percentage, 2),
+            'percentage': self._coverage_percentage(covered_units, len(semantic_gaps)),
             'covered_units': covered_units,
             'gap_units': len(semantic_gaps),
             'total_semantic_units': total_semantic_units,
             'dhatu_distribution': self._get_dhatu_distribution(dhatu_matches)
         }
     
+    @staticmethod
+    def _coverage_percentage(covered_units: int, gap_units: int) -> float:
+        """Pourcentage d'unités sémantiques couvertes, arrondi à 2 décimales"""
+        total_semantic_units = covered_units + gap_units
+        
+        if total_semantic_units == 0:
+            coverage_percentage = 100.0
+        else:
+            coverage_percentage = (covered_units / total_semantic_units) * 100
+        
+        return round(coverage_percentage, 2)
+    
     def _get_dhatu_distribution(self, matches: List[DhatuMatch]) -> Dict[str, int]:
         """Calcule la distribution des dhātu détectés"""
         distribution = defaultdict(int)
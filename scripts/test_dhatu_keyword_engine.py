@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Parité du moteur Aho-Corasick ('keywords') avec le moteur regex
+Chaque jeu de patterns du registre est compilé avec les deux moteurs ; les
+détections doivent être identiques sur tous les textes prompts_child et sur
+quelques cas de casse Unicode (ſ, K de Kelvin, İ...).
+Lancer : python -m unittest test_dhatu_keyword_engine (depuis scripts/)
+"""
+
+import unittest
+from collections.abc import Mapping
+from unittest import mock
+import dhatu_pattern_bank
+from corpus_reader import iter_child_prompt_items, list_child_prompt_langs
+from dhatu_pattern_bank import PatternBank
+from dhatu_pattern_registry import get_pattern_set, list_pattern_sets
+
+CASE_SAMPLES = [
+    "PRINT the list, Print it again",
+    "ſay it while the loop runs",  # s long : équivaut à s en IGNORECASE
+    "Keep the Key",  # K de Kelvin
+    "İf ıf IF if",
+    "ÉCRIT le message puis envoie-le",
+]
+
+def _groups(name: str):
+    """Groupes {type: {catégorie: [pattern, ...]}} d'un jeu du registre"""
+    return {kind: {category: list(info['patterns'] if isinstance(info, Mapping) else info)
+                   for category, info in categories.items()}
+            for kind, categories in get_pattern_set(name).groups.items()}
+
+def _texts():
+    texts = [item['text'] for lang in list_child_prompt_langs() for item in iter_child_prompt_items(lang)]
+    return texts + CASE_SAMPLES
+
+class KeywordEngineParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.texts = _texts()
+
+    def test_prompts_child_present(self):
+        self.assertGreater(len(self.texts), len(CASE_SAMPLES))
+
+    def test_keywords_match_regex(self):
+        for name in list_pattern_sets():
+            with self.subTest(pattern_set=name):
+                groups = _groups(name)
+                keywords = PatternBank(groups, engine='keywords')
+                regex = PatternBank(groups, engine='regex')
+                self.assertEqual(regex.engine, 'regex')
+                for text in self.texts:
+                    self.assertEqual(keywords.scan(text), regex.scan(text), text)
+
+    def test_keyword_engine_used(self):
+        # Sans mots-clés extraits, la parité ci-dessus ne testerait rien
+        self.assertEqual(PatternBank(_groups('semantic')).engine, 'keywords')
+
+    def test_fallback_without_case_folding(self):
+        groups = _groups('semantic')
+        with mock.patch.object(dhatu_pattern_bank, 'CASE_FOLDING_AVAILABLE', False):
+            bank = PatternBank(groups)
+        self.assertEqual(bank.engine, 'regex')
+        regex = PatternBank(groups, engine='regex')
+        for text in self.texts:
+            self.assertEqual(bank.scan(text), regex.scan(text), text)
+
+if __name__ == '__main__':
+    unittest.main()
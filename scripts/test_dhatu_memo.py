@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Résultats mémoïsés (dhatu_memo) : figés mais sérialisables
+Un hit du memo doit se sérialiser en JSON exactement comme le miss qui l'a
+produit, et rester protégé contre les modifications de l'appelant.
+Lancer : python -m unittest test_dhatu_memo (depuis scripts/)
+"""
+
+import json
+import pickle
+import unittest
+from dhatu_memo import AnalysisMemo, freeze
+from optimal_dhatu_analyzer import OptimalDhatuAnalyzer
+from semantic_coverage_analyzer import SemanticCoverageAnalyzer
+
+TEXT = "Le chat voit la souris et la suit dans le jardin parce qu'elle a faim"
+# Champs sérialisables des résultats de chaque analyseur (les détections sont des enregistrements)
+JSON_FIELDS = {
+    OptimalDhatuAnalyzer: ('text', 'coverage_stats', 'dhatu_distribution'),
+    SemanticCoverageAnalyzer: ('text', 'coverage_score', 'analysis_summary')
+}
+
+def _dump(result, fields) -> str:
+    return json.dumps({field: result[field] for field in fields}, ensure_ascii=False, sort_keys=True)
+
+class FreezeTest(unittest.TestCase):
+
+    def test_frozen_value_dumps_like_original(self):
+        value = {'a': [1, {'b': 2}], 'c': {'d': 'é'}}
+        self.assertEqual(json.dumps(freeze(value)), json.dumps(value))
+        self.assertEqual(pickle.loads(pickle.dumps(freeze(value))), freeze(value))
+
+    def test_frozen_value_is_read_only(self):
+        frozen = freeze({'a': {'b': 1}})
+        with self.assertRaises(TypeError):
+            frozen['a'] = 2
+        with self.assertRaises(TypeError):
+            frozen['a'].update(b=2)
+        self.assertEqual(frozen, {'a': {'b': 1}})
+
+class MemoHitTest(unittest.TestCase):
+
+    def test_memo_hit_dumps_like_miss(self):
+        for analyzer_class, fields in JSON_FIELDS.items():
+            with self.subTest(analyzer=analyzer_class.__name__):
+                expected = _dump(analyzer_class().analyze_text(TEXT), fields)
+                analyzer = analyzer_class(memo_capacity=4)
+                analyzer.analyze_text(TEXT)
+                hit = analyzer.analyze_text(TEXT)
+                self.assertEqual(analyzer.memo.hits, 1)
+                self.assertEqual(_dump(hit, fields), expected)
+
+    def test_memo_evicts_least_recent(self):
+        memo = AnalysisMemo(capacity=2)
+        memo.put('a', {'n': 1})
+        memo.put('b', {'n': 2})
+        memo.get('a')
+        memo.put('c', {'n': 3})
+        self.assertIsNone(memo.get('b'))
+        self.assertEqual(memo.get('a'), {'n': 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Corpus pré-tokenisé sur disque, ouvert par mmap
+Un répertoire <nom>.dhc contient des colonnes binaires lues sans copie :
+- text.bin / text.idx : phrases en UTF-8 concaténées + offsets (octets)
+- id.bin / id.idx, phenomena.bin / phenomena.idx : id et phénomènes des items
+- tokens.bin : offsets [début, fin) des mots, relatifs à la phrase (int64),
+  segmentés selon la langue (dhatu_segmenter)
+- tokens.idx : premier token de chaque phrase (int64)
+- lang.bin : identifiant de langue par phrase (uint16)
+- lang.idx : indices des phrases groupés par langue (int64) ; meta.json
+  donne le début de chaque groupe (language_offsets)
+- meta.json : version, langues, nombre de phrases et de tokens, ordre des
+  octets, identité du segmenteur (un corpus tokenisé avec d'autres lexiques
+  est refusé)
+Les colonnes numériques sont écrites en petit-boutiste quel que soit l'hôte ;
+un hôte gros-boutiste les relit en mémoire (copie inversée) au lieu du mmap.
+Construit une fois depuis prompts_child ou un JSONL ; les exécutions
+suivantes ne relisent ni JSON ni regex, et les processus workers partagent
+les pages du fichier via le cache du système.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+from corpus_reader import iter_child_prompt_items, iter_jsonl_items, list_child_prompt_langs
+from dhatu_tokenizer import TokenStream
+from dhatu_segmenter import segmenter_fingerprint, tokenize_for_language
+
+# 2 : mots CJK segmentés (la version 1 gardait une phrase entière)
+# 3 : petit-boutiste explicite, index des phrases par langue (lang.idx)
+FORMAT_VERSION = 3
+BYTE_ORDER = 'little'
+PHENOMENA_SEPARATOR = '\x1f'
+_STRING_COLUMNS = ('text', 'id', 'phenomena')
+
+def _write_array(values: array, f):
+    """Écrit un array en petit-boutiste"""
+    if sys.byteorder != BYTE_ORDER:
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+class _StringColumnWriter:
+    """Écrit une colonne de chaînes : blob UTF-8 + offsets en octets"""
+
+    def __init__(self, directory: str, name: str):
+        self.blob = open(os.path.join(directory, f"{name}.bin"), 'wb')
+        self.index = open(os.path.join(directory, f"{name}.idx"), 'wb')
+        self.position = 0
+        _write_array(array('q', [0]), self.index)
+
+    def append(self, value: str):
+        data = value.encode('utf-8')
+        self.blob.write(data)
+        self.position += len(data)
+        _write_array(array('q', [self.position]), self.index)
+
+    def close(self):
+        self.blob.close()
+        self.index.close()
+
+def build_tokenized_corpus(output_dir: str, items: Iterable[Tuple[str, Dict]]) -> Dict:
+    """Construit un corpus pré-tokenisé à partir de (langue, item) en flux
+
+    item : dict avec au moins "text" (et éventuellement "id", "phenomena").
+    Retourne les métadonnées écrites dans meta.json.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    columns = {name: _StringColumnWriter(output_dir, name) for name in _STRING_COLUMNS}
+    languages: Dict[str, int] = {}
+    by_language: List[array] = []  # indices des phrases de chaque langue
+    sentence_count = token_count = 0
+    with open(os.path.join(output_dir, 'tokens.bin'), 'wb') as tokens_file, \
+         open(os.path.join(output_dir, 'tokens.idx'), 'wb') as token_index, \
+         open(os.path.join(output_dir, 'lang.bin'), 'wb') as lang_file:
+        _write_array(array('q', [0]), token_index)
+        for lang, item in items:
+            text = item['text']
+            stream = tokenize_for_language(text, lang)
+            columns['text'].append(text)
+            columns['id'].append(str(item.get('id', '')))
+            columns['phenomena'].append(PHENOMENA_SEPARATOR.join(item.get('phenomena', [])))
+            _write_array(array('q', stream.offsets), tokens_file)
+            token_count += len(stream)
+            _write_array(array('q', [token_count]), token_index)
+            lang_id = languages.setdefault(lang, len(languages))
+            if lang_id == len(by_language):
+                by_language.append(array('q'))
+            by_language[lang_id].append(sentence_count)
+            _write_array(array('H', [lang_id]), lang_file)
+            sentence_count += 1
+    for column in columns.values():
+        column.close()
+    language_offsets = [0]
+    with open(os.path.join(output_dir, 'lang.idx'), 'wb') as f:
+        for indices in by_language:
+            _write_array(indices, f)
+            language_offsets.append(language_offsets[-1] + len(indices))
+    meta = {
+        'version': FORMAT_VERSION,
+        'languages': list(languages),
+        'sentences': sentence_count,
+        'tokens': token_count,
+        'language_offsets': language_offsets,
+        'byteorder': BYTE_ORDER,
+        'segmenter': segmenter_fingerprint()
+    }
+    with open(os.path.join(output_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+def iter_prompts_child_sources(langs: List[str] = None) -> Iterator[Tuple[str, Dict]]:
+    """(langue, item) pour les fichiers prompts_child (toutes les langues par défaut)"""
+    if langs is None:
+        langs = list_child_prompt_langs()
+    for lang in langs:
+        for item in iter_child_prompt_items(lang):
+            yield lang, item
+
+def iter_jsonl_sources(path: str, default_lang: str = 'und') -> Iterator[Tuple[str, Dict]]:
+    """(langue, item) pour un corpus JSONL ; la langue vient du champ "lang" si présent"""
+    for item in iter_jsonl_items(path):
+        yield item.get('lang', default_lang), item
+
+class TokenizedCorpus:
+    """Corpus pré-tokenisé ouvert par mmap : les colonnes sont des memoryview sans copie"""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Version de corpus non supportée: {self.meta.get('version')} "
+                             f"(reconstruire {self.path} avec tokenized_corpus.py)")
+        if self.meta.get('byteorder') != BYTE_ORDER:
+            raise ValueError(f"Ordre des octets non supporté: {self.meta.get('byteorder')}")
+        if self.meta.get('segmenter') != segmenter_fingerprint():
+            raise ValueError(f"Corpus tokenisé avec un autre segmenteur ou d'autres lexiques: "
+                             f"reconstruire {self.path} avec tokenized_corpus.py")
+        self.languages: List[str] = self.meta['languages']
+        self._maps: List[mmap.mmap] = []
+        self._blobs = {}
+        self._indexes = {}
+        for name in _STRING_COLUMNS:
+            self._blobs[name] = self._map(f"{name}.bin")
+            self._indexes[name] = self._numbers(f"{name}.idx", 'q')
+        self._tokens = self._numbers('tokens.bin', 'q')
+        self._token_index = self._numbers('tokens.idx', 'q')
+        self._lang = self._numbers('lang.bin', 'H')
+        self._lang_index = self._numbers('lang.idx', 'q')
+
+    def _map(self, filename: str) -> memoryview:
+        with open(os.path.join(self.path, filename), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b'')  # mmap refuse les fichiers vides
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped)
+
+    def _numbers(self, filename: str, typecode: str) -> memoryview:
+        """Colonne numérique petit-boutiste : vue sur le mmap, ou copie inversée sur un hôte gros-boutiste"""
+        if sys.byteorder == BYTE_ORDER:
+            return self._map(filename).cast(typecode)
+        values = array(typecode)
+        with open(os.path.join(self.path, filename), 'rb') as f:
+            values.frombytes(f.read())
+        values.byteswap()
+        return memoryview(values)
+
+    def __reduce__(self):
+        # Transmis aux workers par chemin : chaque processus mappe le même fichier
+        return (TokenizedCorpus, (self.path,))
+
+    def __len__(self) -> int:
+        return self.meta['sentences']
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.text(i) for i in range(len(self)))
+
+    @property
+    def cache_key(self) -> Tuple:
+        """Identité du corpus sur disque (pour les caches d'incidence)"""
+        stat = os.stat(os.path.join(self.path, 'meta.json'))
+        return ('tokenized', self.path, stat.st_mtime_ns, len(self))
+
+    def _string(self, name: str, index: int) -> str:
+        offsets = self._indexes[name]
+        return str(self._blobs[name][offsets[index]:offsets[index + 1]], 'utf-8')
+
+    def text(self, index: int) -> str:
+        return self._string('text', index)
+
+    def tokens(self, index: int) -> TokenStream:
+        """Flux de tokens de la phrase, sur une vue du fichier (sans copie des offsets)"""
+        first, last = self._token_index[index], self._token_index[index + 1]
+        return TokenStream(self.text(index), self._tokens[2 * first:2 * last])
+
+    def language(self, index: int) -> str:
+        return self.languages[self._lang[index]]
+
+    def item(self, index: int) -> Dict:
+        """Item au format prompts_child, avec ses tokens précalculés"""
+        phenomena = self._string('phenomena', index)
+        tokens = self.tokens(index)
+        return {
+            'id': self._string('id', index),
+            'text': tokens.text,
+            'phenomena': phenomena.split(PHENOMENA_SEPARATOR) if phenomena else [],
+            'lang': self.language(index),
+            'tokens': tokens
+        }
+
+    def indices(self, lang: str = None) -> Iterator[int]:
+        if lang is None:
+            return iter(range(len(self)))
+        if lang not in self.languages:
+            return iter(())
+        # Groupe de la langue dans lang.idx : pas de parcours des autres phrases
+        lang_id = self.languages.index(lang)
+        offsets = self.meta['language_offsets']
+        return iter(self._lang_index[offsets[lang_id]:offsets[lang_id + 1]])
+
+    def iter_items(self, lang: str = None) -> Iterator[Dict]:
+        return (self.item(i) for i in self.indices(lang))
+
+    def iter_token_streams(self, lang: str = None) -> Iterator[TokenStream]:
+        return (self.tokens(i) for i in self.indices(lang))
+
+    def close(self):
+        # Libérer les vues avant de fermer les mmap
+        self._blobs = self._indexes = {}
+        self._tokens = self._token_index = self._lang = self._lang_index = None
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # une vue est encore référencée par l'appelant
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def is_tokenized_corpus(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, 'meta.json'))
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Construit un corpus pré-tokenisé (.dhc)")
+    parser.add_argument('output', help="Répertoire de sortie, par exemple corpus.dhc")
+    parser.add_argument('--jsonl', help="Corpus JSONL source (sinon les fichiers prompts_child)")
+    parser.add_argument('--lang', action='append', help="Langue prompts_child à inclure (répétable)")
+    parser.add_argument('--default-lang', default='und', help="Langue des lignes JSONL sans champ lang")
+    args = parser.parse_args(argv)
+
+    if args.jsonl:
+        sources = iter_jsonl_sources(args.jsonl, args.default_lang)
+    else:
+        sources = iter_prompts_child_sources(args.lang)
+    meta = build_tokenized_corpus(args.output, sources)
+    print(f"✅ {meta['sentences']} phrases, {meta['tokens']} tokens, "
+          f"{len(meta['languages'])} langues → {args.output}")
+
+if __name__ == "__main__":
+    main()